@@ -0,0 +1,319 @@
+# analysis.py
+# -----------------------------
+# Análise estática do TinyBasic (antes da execução)
+# Monta o grafo de fluxo de controle (CFG) das linhas e verifica:
+#   - destinos de GOTO/GOSUB/IF que não existem (erro)
+#   - linhas inalcançáveis (aviso)
+#   - RETURN alcançável sem GOSUB ativo (aviso)
+#   - variáveis lidas antes de receber valor em algum caminho (aviso)
+#   - linhas fora de ordem ou com número repetido (aviso)
+#   - statements depois de GOSUB na mesma linha (aviso: só o
+#     backend vm executa esses statements)
+# Também gera o programa ordenado por número de linha (a última
+# ocorrência de um número repetido vence, como no line_map do
+# Interpreter), com os índices de destino de cada salto já
+# calculados: o Interpreter de árvore recebe o SortedProgram e
+# salta direto para eles, sem consultar o line_map.
+#
+# As arestas seguem o Interpreter de árvore (e os backends closure e
+# trace): execução na ordem da lista, GOSUB volta para a linha
+# seguinte e o resto da linha depois de GOTO/GOSUB/RETURN/END não
+# executa. O backend vm volta para o statement seguinte ao GOSUB;
+# as duas regras só diferem quando há statements depois do GOSUB
+# na mesma linha, e esse caso gera aviso.
+# -----------------------------
+
+from resolver import slot
+
+
+# Um problema encontrado: nível "erro" ou "aviso"
+class Finding:
+    def __init__(self, level, line_num, message):
+        self.level = level
+        self.line_num = line_num
+        self.message = message
+
+    def __str__(self):
+        return f"{self.level.capitalize()}: {self.message}"
+
+
+class Analysis:
+    def __init__(self, ast):
+        self.ast = ast
+        self.line_map = {}
+        for i, (_, line_num, _) in enumerate(ast):
+            self.line_map[line_num] = i
+        self.findings = []
+        self.edges = [[] for _ in ast]      # índice -> [(destino, tipo)]
+        self.return_points = []             # linhas seguintes aos GOSUBs
+        self.return_node = len(ast)         # nó virtual que junta os RETURNs
+        self.reachable = set()
+
+    @property
+    def errors(self):
+        return [f for f in self.findings if f.level == "erro"]
+
+    @property
+    def warnings(self):
+        return [f for f in self.findings if f.level == "aviso"]
+
+    def successors(self, index):
+        # Índices das linhas que podem executar depois de `index`
+        # (o nó de retorno é trocado pelos pontos de retorno)
+        targets = set()
+        for target, _ in self.edges[index]:
+            if target == self.return_node:
+                targets.update(self.return_points)
+            else:
+                targets.add(target)
+        return sorted(targets)
+
+    def report(self):
+        if not self.findings:
+            return "Análise: nenhum problema encontrado"
+        return "\n".join(str(f) for f in self.findings)
+
+    def error(self, line_num, message):
+        self.findings.append(Finding("erro", line_num, message))
+
+    def warning(self, line_num, message):
+        self.findings.append(Finding("aviso", line_num, message))
+
+
+# ============================================================
+# Função principal
+# --------------------------------------------------------
+def analyze(ast):
+    result = Analysis(ast)
+    check_order(result)
+    build_cfg(result)
+    result.reachable = reach(result, 0, through_gosub=True)
+    for i, (_, line_num, _) in enumerate(ast):
+        if i not in result.reachable:
+            result.warning(line_num, f"Linha {line_num} nunca é executada")
+    check_returns(result)
+    check_reads(result)
+    return result
+
+
+def check_order(result):
+    seen = set()
+    last = None
+    for _, line_num, _ in result.ast:
+        if line_num in seen:
+            result.warning(line_num, f"Linha {line_num} repetida (os saltos vão para a última)")
+        elif last is not None and line_num < last:
+            result.warning(line_num, f"Linha {line_num} fora de ordem (depois da {last})")
+        seen.add(line_num)
+        last = line_num
+
+
+# ============================================================
+# CFG: arestas (destino, tipo) de cada linha
+# tipos: "next" (segue para a linha seguinte), "jump" (GOTO/IF),
+# "call" (GOSUB -> sub-rotina), "after_call" (GOSUB -> linha seguinte,
+# quando a sub-rotina retornar), "return" (RETURN -> nó de retorno).
+# Sem análise de contexto, todo RETURN pode voltar a todo ponto de
+# retorno: em vez de |RETURNs| x |pontos| arestas, os RETURNs vão
+# para um único nó virtual (índice len(ast)) que leva aos pontos.
+# --------------------------------------------------------
+def line_exits(stmts):
+    # Statements que de fato executam e se a linha segue adiante
+    for pos, stmt in enumerate(stmts):
+        if stmt[0] in ("GOTO", "GOSUB", "RETURN", "END", "IFELSE"):
+            return stmts[:pos + 1], False
+    return stmts, True
+
+
+def build_cfg(result):
+    ast, line_map, edges = result.ast, result.line_map, result.edges
+    n = len(ast)
+    for i, (_, line_num, stmts) in enumerate(ast):
+        live, falls_through = line_exits(stmts)
+        if live[-1:] and live[-1][0] == "GOSUB" and len(live) < len(stmts):
+            result.warning(line_num, f"Statements depois do GOSUB na linha {line_num} só "
+                                     f"executam no backend vm (os outros voltam para a "
+                                     f"linha seguinte)")
+        for stmt in live:
+            t = stmt[0]
+            if t in ("GOTO", "IF", "GOSUB"):
+                targets = [(stmt[-1], t)]
+            elif t == "IFELSE":
+                targets = [(stmt[2], "IF"), (stmt[3], "GOTO")]
+            else:
+                targets = []
+            for target_num, kind in targets:
+                if target_num not in line_map:
+                    result.error(line_num, f"Linha {target_num} não encontrada para "
+                                           f"{kind} (linha {line_num})")
+                    continue
+                edges[i].append((line_map[target_num], "call" if kind == "GOSUB" else "jump"))
+            if t == "GOSUB" and i + 1 < n:
+                result.return_points.append(i + 1)
+                edges[i].append((i + 1, "after_call"))
+            if t == "RETURN":
+                edges[i].append((result.return_node, "return"))
+        if falls_through and i + 1 < n:
+            edges[i].append((i + 1, "next"))
+
+
+def reach(result, start, through_gosub):
+    # Linhas alcançáveis a partir de `start`. Sem through_gosub, um
+    # GOSUB pula direto para a linha seguinte (contexto principal)
+    if not result.ast:
+        return set()
+    seen = set()
+    pending = [start]
+    while pending:
+        i = pending.pop()
+        if i in seen:
+            continue
+        seen.add(i)
+        for target, kind in result.edges[i]:
+            # Os pontos de retorno já chegam pelas arestas after_call
+            if kind == "return" or (kind == "call" and not through_gosub):
+                continue
+            pending.append(target)
+    return seen
+
+
+def check_returns(result):
+    # RETURN executado no contexto principal (sem GOSUB na pilha)
+    main = reach(result, 0, through_gosub=False)
+    for i in sorted(main):
+        _, line_num, stmts = result.ast[i]
+        if any(stmt[0] == "RETURN" for stmt in line_exits(stmts)[0]):
+            result.warning(line_num, f"RETURN sem GOSUB correspondente (linha {line_num})")
+
+
+# ============================================================
+# Variáveis lidas antes de receber valor
+# Análise "definitivamente atribuída" sobre o CFG: o conjunto na
+# entrada de uma linha é a interseção do que chega por todas as
+# arestas; ler uma variável fora do conjunto gera aviso.
+# Conjuntos de variáveis são inteiros com um bit por slot (A = bit 0).
+# --------------------------------------------------------
+def expr_reads(expr, out):
+    if expr[0] == "ID":
+        out.append(expr[1])
+    elif expr[0] == "INDEX":
+        expr_reads(expr[2], out)
+    elif expr[0] == "BINOP":
+        expr_reads(expr[2], out)
+        expr_reads(expr[3], out)
+    return out
+
+
+def stmt_reads(stmt):
+    t = stmt[0]
+    if t == "LET":
+        return expr_reads(stmt[2], [])
+    elif t == "LET_INDEX":
+        return expr_reads(stmt[3], expr_reads(stmt[2], []))
+    elif t in ("DIM", "INPUT_INDEX"):
+        return expr_reads(stmt[2], [])
+    elif t == "INC":
+        return [stmt[1]]
+    elif t == "PRINT":
+        out = []
+        for item in stmt[1]:
+            if item[0] != "STR":
+                expr_reads(item, out)
+        return out
+    elif t in ("IF", "IFELSE"):
+        _, left, _, right = stmt[1]
+        return expr_reads(right, expr_reads(left, []))
+    return []
+
+
+def flow_line(result, i, assigned, warn):
+    # Percorre a linha com o conjunto de entrada; devolve o conjunto
+    # em cada saída: [(destino, conjunto)]. A sub-rotina não é
+    # seguida até o fim: a linha de retorno recebe o que vem dos RETURNs
+    ast, line_map = result.ast, result.line_map
+    _, line_num, stmts = ast[i]
+    live, falls_through = line_exits(stmts)
+    out = []
+    for stmt in live:
+        t = stmt[0]
+        for var in stmt_reads(stmt):
+            if not assigned >> slot(var) & 1 and warn is not None:
+                warn(line_num, var)
+        if t in ("LET", "INPUT", "INC"):
+            assigned |= 1 << slot(stmt[1])
+        elif t in ("IF", "GOTO", "GOSUB"):
+            if stmt[-1] in line_map:
+                out.append((line_map[stmt[-1]], assigned))
+        elif t == "IFELSE":
+            out.extend((line_map[num], assigned) for num in stmt[2:] if num in line_map)
+        elif t == "RETURN":
+            out.append((result.return_node, assigned))
+    if falls_through and i + 1 < len(ast):
+        out.append((i + 1, assigned))
+    return out
+
+
+def check_reads(result):
+    n = len(result.ast)
+    entry = [None] * (n + 1)     # None = ainda não alcançada; entry[n]: nó de retorno
+    if n:
+        entry[0] = 0
+    pending = [0] if n else []
+    while pending:
+        i = pending.pop()
+        if i == n:
+            # Nó de retorno: a interseção de todos os RETURNs vai para
+            # cada ponto de retorno (só muda no máximo 27 vezes)
+            exits = [(point, entry[n]) for point in result.return_points]
+        else:
+            exits = flow_line(result, i, entry[i], None)
+        for target, assigned in exits:
+            merged = assigned if entry[target] is None else entry[target] & assigned
+            if merged != entry[target]:
+                entry[target] = merged
+                pending.append(target)
+
+    warned = set()
+
+    def warn(line_num, var):
+        if (line_num, var) not in warned:
+            warned.add((line_num, var))
+            result.warning(line_num, f"Variável {var} pode ser lida antes de receber "
+                                     f"valor (linha {line_num})")
+    for i in range(n):
+        if entry[i] is not None:
+            flow_line(result, i, entry[i], warn)
+
+
+# ============================================================
+# Programa ordenado por número de linha
+# --------------------------------------------------------
+class SortedProgram:
+    def __init__(self, ast):
+        last = {}
+        for line in ast:
+            last[line[1]] = line        # número repetido: vale o último
+        self.lines = [last[num] for num in sorted(last)]
+        self.line_map = {line[1]: i for i, line in enumerate(self.lines)}
+        # successors[i][pos]: índices de destino do statement pos da
+        # linha i: () se não salta ou se o destino não existe (o erro
+        # fica para a execução), (índice,) para IF/GOTO/GOSUB e
+        # (então, senão) para IFELSE
+        self.successors = [[self.targets(stmt) for stmt in stmts]
+                           for _, _, stmts in self.lines]
+
+    def targets(self, stmt):
+        t = stmt[0]
+        if t in ("IF", "GOTO", "GOSUB"):
+            nums = stmt[-1:]
+        elif t == "IFELSE":
+            nums = stmt[2:]
+        else:
+            return ()
+        if any(num not in self.line_map for num in nums):
+            return ()
+        return tuple(self.line_map[num] for num in nums)
+
+
+def sort_program(ast):
+    return SortedProgram(ast)
@@ -0,0 +1,150 @@
+# arrays.py
+# -----------------------------
+# Arrays do TinyBasic (DIM A(n))
+# Cada uma das 26 letras pode ter, além da variável escalar, um
+# array de n inteiros de 64 bits com índices 0..n-1:
+#   DIM A(100)          aloca (zerado)
+#   LET A(I) = X        escreve
+#   PRINT A(I)          lê
+#   INPUT A(I)          lê da entrada
+# Os valores ficam em um array("q") contíguo (8 bytes por valor,
+# sem um objeto Python por elemento), com verificação de limites
+# e um teto de memória para todos os arrays do programa.
+# Arrays grandes podem ser carregados de um arquivo antes da
+# execução (load); com NumPy disponível, o arquivo é convertido
+# por ele (cerca de 1,5x mais rápido que int() valor a valor).
+# -----------------------------
+
+from array import array
+
+from resolver import VAR_NAMES, slot
+
+CELL_BYTES = 8
+DEFAULT_MAX_CELLS = 16 * 2**20     # 16M valores (128 MiB) somando todos os arrays
+
+
+class ArrayStore:
+    def __init__(self, max_cells=DEFAULT_MAX_CELLS):
+        self.max_cells = max_cells
+        self.data = [None] * len(VAR_NAMES)   # slot -> array("q") ou None
+        self.loaded = set()                   # slots carregados por load() e ainda sem DIM
+
+    def cells(self):
+        return sum(len(values) for values in self.data if values is not None)
+
+    # ========================================================
+    # DIM: aloca (ou realoca) o array. Um array vindo de load()
+    # mantém os valores no primeiro DIM (cortado ou completado
+    # com zeros até o novo tamanho)
+    # --------------------------------------------------------
+    def dim(self, s, size):
+        name = VAR_NAMES[s]
+        if size < 0:
+            raise Exception(f"Tamanho inválido em DIM {name}({size})")
+        old = self.data[s]
+        in_use = self.cells() - (len(old) if old is not None else 0)
+        if in_use + size > self.max_cells:
+            raise Exception(f"DIM {name}({size}) passa do limite de memória dos arrays "
+                            f"({self.max_cells} valores)")
+        if s in self.loaded:
+            self.loaded.discard(s)
+            values = old[:size]
+            if len(values) < size:
+                values.frombytes(bytes(CELL_BYTES * (size - len(values))))
+        else:
+            values = array("q", bytes(CELL_BYTES * size))
+        self.data[s] = values
+
+    # ========================================================
+    # Leitura e escrita com verificação de limites
+    # --------------------------------------------------------
+    def values(self, s):
+        values = self.data[s]
+        if values is None:
+            raise Exception(f"Array {VAR_NAMES[s]} usado sem DIM")
+        return values
+
+    def get(self, s, index):
+        values = self.data[s]
+        if values is None or not 0 <= index < len(values):
+            self.check(s, index)
+        return values[index]
+
+    def put(self, s, index, value):
+        values = self.data[s]
+        if values is None or not 0 <= index < len(values):
+            self.check(s, index)
+        try:
+            values[index] = value
+        except OverflowError:
+            raise Exception(f"Valor {value} não cabe em {VAR_NAMES[s]}({index}) "
+                            f"(inteiro de 64 bits)") from None
+
+    # Valida o índice antes de ler a entrada (INPUT A(I))
+    def check_index(self, s, index):
+        values = self.data[s]
+        if values is None or not 0 <= index < len(values):
+            self.check(s, index)
+
+    def check(self, s, index):
+        values = self.values(s)
+        raise Exception(f"Índice {index} fora dos limites de {VAR_NAMES[s]} "
+                        f"(0 a {len(values) - 1})")
+
+    # ========================================================
+    # Carga em bloco de um arquivo: inteiros separados por espaços
+    # ou quebras de linha. O tamanho do array é o número de valores
+    # --------------------------------------------------------
+    def load(self, name, path):
+        s = slot(name)
+        with open(path, "rb") as f:
+            data = f.read()
+        try:
+            import numpy as np      # opcional (e caro de importar): só aqui
+        except ImportError:
+            np = None
+        try:
+            if np is not None:
+                values = array("q", np.array(data.split(), dtype=np.int64).tobytes())
+            else:
+                values = array("q", map(int, data.split()))
+        except (ValueError, OverflowError) as e:
+            raise Exception(f"Valor inválido em {path} para o array {name}: {e}") from None
+        old = self.data[s]
+        in_use = self.cells() - (len(old) if old is not None else 0)
+        if in_use + len(values) > self.max_cells:
+            raise Exception(f"{path} tem {len(values)} valores: passa do limite de memória "
+                            f"dos arrays ({self.max_cells} valores)")
+        self.data[s] = values
+        self.loaded.add(s)
+
+    def snapshot(self):
+        # Arrays dimensionados: nome -> lista de valores (debug)
+        return {VAR_NAMES[s]: values.tolist()
+                for s, values in enumerate(self.data) if values is not None}
+
+
+# Programa usa arrays? (backends que não os suportam recusam)
+def uses_arrays(ast):
+    return any(stmt[0] in ("DIM", "LET_INDEX", "INPUT_INDEX") or
+               any(expr_uses_arrays(expr) for expr in stmt_exprs(stmt))
+               for _, _, stmts in ast for stmt in stmts)
+
+
+def stmt_exprs(stmt):
+    t = stmt[0]
+    if t == "LET":
+        return [stmt[2]]
+    elif t == "PRINT":
+        return [item for item in stmt[1] if item[0] != "STR"]
+    elif t in ("IF", "IFELSE"):
+        return [stmt[1][1], stmt[1][3]]
+    return []
+
+
+def expr_uses_arrays(expr):
+    if expr[0] == "INDEX":
+        return True
+    if expr[0] == "BINOP":
+        return expr_uses_arrays(expr[2]) or expr_uses_arrays(expr[3])
+    return False
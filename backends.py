@@ -0,0 +1,35 @@
+# backends.py
+# -----------------------------
+# TinyBasic - Registro dos backends de execução
+# Todos recebem a AST do Parser e expõem run()
+# Os módulos dos backends só são importados quando usados:
+# load_backend(nome) carrega um; BACKENDS (nome -> classe) carrega
+# todos na primeira vez que é acessado.
+# Diferença de semântica: no vm o GOSUB volta para o statement
+# seguinte; nos outros, para a linha seguinte (o resto da linha do
+# GOSUB não executa). Com "10 GOSUB 100 : GOTO 40", só o vm faz o GOTO.
+# -----------------------------
+
+import importlib
+
+# nome -> (módulo, classe)
+BACKEND_CLASSES = {
+    "tree": ("interpreter", "Interpreter"),          # percorre a AST (padrão)
+    "closure": ("closures", "ClosureInterpreter"),   # compila a AST em closures
+    "vm": ("bytecode", "BytecodeVM"),                # bytecode; GOSUB volta ao statement seguinte
+    "trace": ("tracing", "TracingInterpreter"),      # compila os laços quentes (traces)
+}
+BACKEND_NAMES = sorted(BACKEND_CLASSES)
+
+
+def load_backend(name):
+    module, cls = BACKEND_CLASSES[name]
+    return getattr(importlib.import_module(module), cls)
+
+
+def __getattr__(name):
+    if name == "BACKENDS":
+        backends = {backend: load_backend(backend) for backend in BACKEND_CLASSES}
+        globals()["BACKENDS"] = backends
+        return backends
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,227 @@
+# batch.py
+# -----------------------------
+# TinyBasic - Execução em lote
+# Roda todos os programas de um diretório em paralelo, em um
+# pool de processos (um interpretador por processo, sem GIL
+# compartilhado). Para cada programa "nome.txt":
+#   - nome.in:  valores do INPUT, um por linha (opcional)
+#   - nome.out: saída esperada (opcional)
+# Cada execução tem limite de tempo e de passos. No fim, gera um
+# relatório agregado em JSON e/ou CSV.
+# -----------------------------
+
+import argparse
+import csv
+import glob
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import lexer
+from parser import Parser
+from backends import BACKENDS
+from interpreter import ExecutionStopped
+from streams import BufferedOutput, ListInput, FLUSH_END
+
+INPUT_SUFFIX = ".in"
+EXPECTED_SUFFIX = ".out"
+
+# Situação final de cada programa
+STATUS_OK = "ok"              # rodou e bateu com a saída esperada (ou não havia)
+STATUS_FAIL = "fail"          # rodou, mas a saída é diferente da esperada
+STATUS_TIMEOUT = "timeout"    # passou do limite de tempo
+STATUS_STEPS = "step_limit"   # passou do limite de passos
+STATUS_ERROR = "error"        # erro léxico, sintático ou de execução
+STATUSES = (STATUS_OK, STATUS_FAIL, STATUS_TIMEOUT, STATUS_STEPS, STATUS_ERROR)
+
+
+# ============================================================
+# Descobre os programas e os arquivos de entrada/saída esperada
+# --------------------------------------------------------
+def find_jobs(directory, pattern="*.txt"):
+    jobs = []
+    for path in sorted(glob.glob(os.path.join(directory, pattern))):
+        base = os.path.splitext(path)[0]
+        input_path = base + INPUT_SUFFIX
+        expected_path = base + EXPECTED_SUFFIX
+        jobs.append({
+            "program": path,
+            "input": input_path if os.path.exists(input_path) else None,
+            "expected": expected_path if os.path.exists(expected_path) else None,
+        })
+    return jobs
+
+
+def read_text(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def first_difference(output, expected):
+    # Número (1, 2, ...) da primeira linha diferente, ou None
+    out_lines = output.splitlines()
+    exp_lines = expected.splitlines()
+    for i, (a, b) in enumerate(zip(out_lines, exp_lines)):
+        if a.rstrip() != b.rstrip():
+            return i + 1
+    if len(out_lines) != len(exp_lines):
+        return min(len(out_lines), len(exp_lines)) + 1
+    return None
+
+
+# ============================================================
+# Executa um programa (roda dentro do processo do pool)
+# O limite de tempo usa o mesmo mecanismo do botão Parar da GUI:
+# um timer chama cancel() e o interpretador para no próximo passo.
+# --------------------------------------------------------
+def run_job(job, backend="tree", timeout=None, max_steps=None):
+    result = {"program": job["program"], "status": STATUS_OK, "steps": 0,
+              "time": 0.0, "error": None, "diff_line": None}
+    buffer = io.StringIO()
+    start = time.perf_counter()
+    timer = None
+    timed_out = threading.Event()
+    try:
+        code = read_text(job["program"])
+        ast = Parser(lexer(code)).parse_program()
+        values = ListInput.from_text(read_text(job["input"])) if job["input"] else ListInput([])
+        interpreter = BACKENDS[backend](ast, output=BufferedOutput(buffer, flush=FLUSH_END),
+                                        input=values)
+        if timeout is not None:
+            def expire():
+                timed_out.set()
+                interpreter.cancel()
+            timer = threading.Timer(timeout, expire)
+            timer.daemon = True
+            timer.start()
+        try:
+            # Sempre com limite para que cancel() seja verificado
+            interpreter.run(max_steps=max_steps if max_steps is not None else sys.maxsize)
+        finally:
+            result["steps"] = interpreter.steps
+    except ExecutionStopped as e:
+        result["status"] = STATUS_TIMEOUT if timed_out.is_set() else STATUS_STEPS
+        result["error"] = str(e)
+    except Exception as e:
+        result["status"] = STATUS_ERROR
+        result["error"] = str(e)
+    finally:
+        if timer is not None:
+            timer.cancel()
+        result["time"] = time.perf_counter() - start
+
+    if result["status"] == STATUS_OK and job["expected"]:
+        diff_line = first_difference(buffer.getvalue(), read_text(job["expected"]))
+        if diff_line is not None:
+            result["status"] = STATUS_FAIL
+            result["diff_line"] = diff_line
+    return result
+
+
+def run_chunk(jobs, backend, timeout, max_steps):
+    # Vários jobs por tarefa do pool: menos idas e voltas entre processos
+    return [run_job(job, backend, timeout, max_steps) for job in jobs]
+
+
+# ============================================================
+# Distribui os programas pelo pool de processos
+# Os processos recebem só os caminhos (não a AST), e os jobs
+# vão em blocos para que o custo de comunicação não domine.
+# --------------------------------------------------------
+def run_batch(jobs, workers=None, backend="tree", timeout=None, max_steps=None):
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if workers == 1:
+        results = run_chunk(jobs, backend, timeout, max_steps)
+    else:
+        chunk_size = max(1, len(jobs) // (workers * 4))
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        results = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_chunk, chunk, backend, timeout, max_steps)
+                       for chunk in chunks]
+            for future in futures:
+                results.extend(future.result())
+    return build_report(results, workers, time.perf_counter() - start)
+
+
+def build_report(results, workers, wall_time):
+    summary = {status: 0 for status in STATUSES}
+    for r in results:
+        summary[r["status"]] += 1
+    return {
+        "total": len(results),
+        "workers": workers,
+        "wall_time": wall_time,
+        "cpu_time": sum(r["time"] for r in results),
+        "summary": summary,
+        "results": results,
+    }
+
+
+# ============================================================
+# Relatórios
+# --------------------------------------------------------
+CSV_FIELDS = ("program", "status", "steps", "time", "diff_line", "error")
+
+
+def write_json(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def write_csv(report, path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for r in report["results"]:
+            writer.writerow({field: r[field] for field in CSV_FIELDS})
+
+
+def print_report(report, verbose=False):
+    for r in report["results"]:
+        if verbose or r["status"] != STATUS_OK:
+            detail = r["error"] or (f"primeira diferença na linha {r['diff_line']}"
+                                    if r["diff_line"] else "")
+            print(f"{r['status']:>10}  {r['program']}  {detail}")
+    summary = ", ".join(f"{status}: {count}" for status, count in report["summary"].items())
+    print(f"{report['total']} programas em {report['wall_time']:.2f} s "
+          f"({report['workers']} processos) - {summary}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Execução em lote de programas TinyBasic")
+    arg_parser.add_argument("directory", help="diretório com os programas")
+    arg_parser.add_argument("--pattern", default="*.txt",
+                            help="padrão dos arquivos de programa (padrão: *.txt)")
+    arg_parser.add_argument("--jobs", "-j", type=int,
+                            help="número de processos (padrão: número de CPUs)")
+    arg_parser.add_argument("--backend", choices=sorted(BACKENDS), default="tree",
+                            help="backend de execução (padrão: tree). No vm o GOSUB volta para "
+                                 "o statement seguinte; nos outros, para a linha seguinte")
+    arg_parser.add_argument("--timeout", type=float, default=10.0,
+                            help="limite de tempo por programa em segundos (padrão: 10)")
+    arg_parser.add_argument("--max-steps", type=int,
+                            help="limite de passos por programa")
+    arg_parser.add_argument("--json", metavar="ARQUIVO", help="grava o relatório em JSON")
+    arg_parser.add_argument("--csv", metavar="ARQUIVO", help="grava o relatório em CSV")
+    arg_parser.add_argument("--verbose", "-v", action="store_true",
+                            help="lista também os programas que passaram")
+    args = arg_parser.parse_args()
+
+    jobs = find_jobs(args.directory, args.pattern)
+    if not jobs:
+        arg_parser.error(f"nenhum programa {args.pattern} em {args.directory}")
+
+    report = run_batch(jobs, args.jobs, args.backend, args.timeout or None, args.max_steps)
+    print_report(report, args.verbose)
+    if args.json:
+        write_json(report, args.json)
+    if args.csv:
+        write_csv(report, args.csv)
+    # Código de saída diferente de zero se algum programa não passou
+    sys.exit(0 if report["summary"][STATUS_OK] == report["total"] else 1)
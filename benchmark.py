@@ -0,0 +1,300 @@
+# benchmark.py
+# -----------------------------
+# TinyBasic - Benchmarks
+#   suite:    gera as cargas de workloads.py e mede lexer, parser
+#             e execução separadamente; salva JSON e compara com
+#             um baseline
+#   backends: roda um laço pesado em cada backend de execução
+#   tokens:   compara as representações de tokens
+#   startup:  tempo de partida a frio de "python main.py" em um
+#             programa pequeno (execuções curtas em scripts)
+# -----------------------------
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from lexer import lexer, lexer_stream
+from parser import Parser
+from interpreter import Interpreter
+from backends import BACKENDS
+from streams import BufferedOutput
+from workloads import WORKLOADS, counted_loop, straight_line
+
+
+# ============================================================
+# Conta quantos statements o interpretador de árvore executa
+# --------------------------------------------------------
+class CountingInterpreter(Interpreter):
+    def __init__(self, ast, output=None, input=None):
+        super().__init__(ast, output=output, input=input)
+        self.executed = 0
+
+    def execute_stmt(self, stmt, current_index):
+        self.executed += 1
+        return super().execute_stmt(stmt, current_index)
+
+
+def count_statements(ast):
+    interpreter = CountingInterpreter(ast, output=BufferedOutput(io.StringIO()))
+    interpreter.run()
+    return interpreter.executed
+
+
+# ============================================================
+# Mede o melhor tempo de `repeat` execuções de cada backend
+# --------------------------------------------------------
+def bench_backends(code, repeat=3):
+    ast = Parser(lexer(code)).parse_program()
+    statements = count_statements(ast)
+    results = {}
+    outputs = {}
+    for name, backend in BACKENDS.items():
+        best = None
+        for _ in range(repeat):
+            buffer = io.StringIO()
+            interpreter = backend(ast, output=BufferedOutput(buffer))
+            start = time.perf_counter()
+            interpreter.run()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = statements / best
+        outputs[name] = buffer.getvalue()
+
+    if len(set(outputs.values())) != 1:
+        raise Exception("Backends produziram saídas diferentes")
+    return statements, results
+
+
+# ============================================================
+# Representação dos tokens: lista de Token com __dict__ (antigo),
+# lista de Token com __slots__ e TokenBuffer (arrays paralelos)
+# ============================================================
+class DictToken:
+    # Token como era antes: objeto comum, com __dict__ por instância
+    def __init__(self, type_, value, line, column):
+        self.type = type_
+        self.value = value
+        self.line = line
+        self.column = column
+
+
+def tokens_size(tokens):
+    # Bytes ocupados pela estrutura dos tokens (sem contar os valores,
+    # que são os mesmos objetos nas três representações)
+    if isinstance(tokens, list):
+        size = sys.getsizeof(tokens)
+        for t in tokens:
+            size += sys.getsizeof(t)
+            if hasattr(t, "__dict__"):
+                size += sys.getsizeof(t.__dict__)
+        return size
+    return (sys.getsizeof(tokens.types) + sys.getsizeof(tokens.values) +
+            sys.getsizeof(tokens.lines) + sys.getsizeof(tokens.columns))
+
+
+def bench_tokens(lines, repeat=3):
+    code = straight_line(lines)
+    variants = {
+        "dict": lambda: list(lexer_stream([code], DictToken)),
+        "slots": lambda: lexer(code),
+        "buffer": lambda: lexer(code, compact=True),
+    }
+    results = {}
+    for name, lex in variants.items():
+        lex_time = parse_time = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            tokens = lex()
+            middle = time.perf_counter()
+            Parser(tokens).parse_program()
+            end = time.perf_counter()
+            lex_time = middle - start if lex_time is None else min(lex_time, middle - start)
+            parse_time = end - middle if parse_time is None else min(parse_time, end - middle)
+        results[name] = {
+            "tokens": len(tokens),
+            "bytes": tokens_size(tokens),
+            "lex_tokens_per_s": len(tokens) / lex_time,
+            "parse_tokens_per_s": len(tokens) / parse_time,
+        }
+    return results
+
+
+# ============================================================
+# Suíte: lexer, parser e execução medidos separadamente
+# ============================================================
+def best_time(fn, repeat):
+    best = result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_workload(code, backend="tree", repeat=3):
+    lex_time, tokens = best_time(lambda: lexer(code), repeat)
+    parse_time, ast = best_time(lambda: Parser(tokens).parse_program(), repeat)
+    statements = count_statements(ast)
+
+    # A saída vai para /dev/null: mede a formatação, não o terminal
+    with open(os.devnull, "w") as devnull:
+        def run():
+            BACKENDS[backend](ast, output=BufferedOutput(devnull)).run()
+        run_time, _ = best_time(run, repeat)
+
+    return {
+        "tokens": len(tokens),
+        "lines": len(ast),
+        "statements": statements,
+        "lex_time": lex_time,
+        "parse_time": parse_time,
+        "run_time": run_time,
+        "tokens_per_s": len(tokens) / lex_time,
+        "lines_per_s": len(ast) / parse_time,
+        "statements_per_s": statements / run_time,
+    }
+
+
+def run_suite(backend="tree", scale=1.0, repeat=3, only=None):
+    results = {}
+    for name, (generator, size) in WORKLOADS.items():
+        if only and name not in only:
+            continue
+        size = max(1, int(size * scale))
+        result = bench_workload(generator(size), backend, repeat)
+        result["size"] = size
+        results[name] = result
+    return {
+        "backend": backend,
+        "scale": scale,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "workloads": results,
+    }
+
+
+# ============================================================
+# Partida a frio: cada execução é um processo Python novo
+# Compara com "python -c pass" (custo do próprio interpretador)
+# --------------------------------------------------------
+STARTUP_PROGRAM = '10 LET A = 2\n20 PRINT "A =", A * 21\n30 END\n'
+
+
+def bench_startup(runs=20, extra_args=()):
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    with tempfile.TemporaryDirectory() as directory:
+        program = os.path.join(directory, "startup.txt")
+        with open(program, "w", encoding="utf-8") as f:
+            f.write(STARTUP_PROGRAM)
+        env = dict(os.environ, TINYBASIC_CACHE_DIR=os.path.join(directory, "cache"))
+        commands = {
+            "python": [sys.executable, "-c", "pass"],
+            "main.py": [sys.executable, main_path, program, *extra_args],
+        }
+        results = {}
+        for name, command in commands.items():
+            subprocess.run(command, env=env, stdout=subprocess.DEVNULL, check=True)  # aquece o cache
+            times = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run(command, env=env, stdout=subprocess.DEVNULL, check=True)
+                times.append(time.perf_counter() - start)
+            times.sort()
+            results[name] = {"best": times[0], "median": times[len(times) // 2]}
+    return results
+
+
+# Métricas comparadas com o baseline (maior é melhor)
+RATES = ("tokens_per_s", "lines_per_s", "statements_per_s")
+
+
+def print_suite(report, baseline=None):
+    base = (baseline or {}).get("workloads", {})
+    print(f"Backend: {report['backend']}  escala: {report['scale']}")
+    print(f"{'carga':<16} {'tokens/s':>14} {'linhas/s':>14} {'statements/s':>14}")
+    for name, r in report["workloads"].items():
+        cells = []
+        for key in RATES:
+            cell = f"{r[key]:>14,.0f}"
+            if name in base:
+                cell += f" ({r[key] / base[name][key]:.2f}x)"
+            cells.append(cell)
+        print(f"{name:<16} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmarks do TinyBasic")
+    arg_parser.add_argument("--repeat", type=int, default=3,
+                            help="execuções de cada medida; vale a melhor (padrão: 3)")
+    commands = arg_parser.add_subparsers(dest="command")
+
+    suite = commands.add_parser("suite", help="mede lexer, parser e execução nas cargas sintéticas")
+    suite.add_argument("--backend", choices=sorted(BACKENDS), default="tree")
+    suite.add_argument("--scale", type=float, default=1.0,
+                       help="multiplica o tamanho de todas as cargas (padrão: 1.0)")
+    suite.add_argument("--only", nargs="+", choices=sorted(WORKLOADS),
+                       help="roda só as cargas indicadas")
+    suite.add_argument("--output", metavar="ARQUIVO", help="salva os resultados em JSON")
+    suite.add_argument("--baseline", metavar="ARQUIVO",
+                       help="JSON de uma execução anterior para comparar")
+
+    backends = commands.add_parser("backends", help="compara os backends em um laço pesado")
+    backends.add_argument("--iterations", type=int, default=200000,
+                          help="iterações do laço (padrão: 200000)")
+
+    tokens = commands.add_parser("tokens", help="compara as representações de tokens")
+    tokens.add_argument("--lines", type=int, default=100000,
+                        help="linhas do programa gerado (padrão: 100000)")
+
+    startup = commands.add_parser("startup", help="mede a partida a frio de main.py")
+    startup.add_argument("--runs", type=int, default=20,
+                         help="processos iniciados por medida (padrão: 20)")
+    startup.add_argument("--no-cache", action="store_true",
+                         help="roda main.py com --no-cache (lexer e parser sempre executam)")
+
+    args = arg_parser.parse_args()
+
+    if args.command == "tokens":
+        results = bench_tokens(args.lines, args.repeat)
+        base = results["dict"]["bytes"]
+        print(f"Tokens: {results['dict']['tokens']}")
+        for name, r in results.items():
+            print(f"{name:>8}: {r['bytes'] / 2**20:8.1f} MiB ({r['bytes'] / base:.2f}x)"
+                  f"  {r['bytes'] / r['tokens']:6.1f} B/token"
+                  f"  lexer {r['lex_tokens_per_s']:>12,.0f} tokens/s"
+                  f"  parser {r['parse_tokens_per_s']:>12,.0f} tokens/s")
+
+    elif args.command == "startup":
+        results = bench_startup(args.runs, ["--no-cache"] if args.no_cache else [])
+        base = results["python"]["median"]
+        for name, r in results.items():
+            print(f"{name:>8}: melhor {r['best'] * 1000:6.1f} ms  mediana {r['median'] * 1000:6.1f} ms"
+                  f"  (+{(r['median'] - base) * 1000:.1f} ms)")
+
+    elif args.command == "backends":
+        statements, results = bench_backends(counted_loop(args.iterations), args.repeat)
+        base = results["tree"]
+        print(f"Statements executados: {statements}")
+        for name, rate in results.items():
+            print(f"{name:>8}: {rate:>14,.0f} statements/s  ({rate / base:.2f}x)")
+
+    else:
+        if args.command is None:
+            args = arg_parser.parse_args(sys.argv[1:] + ["suite"])
+        baseline = None
+        if args.baseline:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        report = run_suite(args.backend, args.scale, args.repeat, args.only)
+        print_suite(report, baseline)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
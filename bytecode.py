@@ -0,0 +1,398 @@
+# bytecode.py
+# -----------------------------
+# Máquina virtual de bytecode do TinyBasic
+# Compila a AST em um fluxo plano de instruções guardado em arrays
+# compactos (opcodes e operandos). Os saltos já saem como offsets de
+# instrução, então linhas inexistentes viram erro de carga.
+# Diferença em relação ao interpretador de árvore: GOSUB retorna
+# para o statement seguinte, e não para a linha seguinte.
+#
+# Para o laço de despacho ser curto, o compilador funde padrões
+# comuns em uma instrução só: comparação + salto do IF
+# (JUMP_IF_LT, ...) e operação com constante à direita (ADD_CONST,
+# ...). O laço testa os opcodes mais frequentes primeiro e conta os
+# passos por blocos, sem teste de limite a cada instrução.
+# -----------------------------
+
+from array import array
+
+from interpreter import ExecutionStopped, Interpreter
+from resolver import VAR_NAMES, slot
+
+# ============================================================
+# Opcodes. Toda instrução tem exatamente um operando
+# (0 quando não é usado).
+# ============================================================
+LOAD = 0          # empilha variável (operando: slot)
+PUSH_CONST = 1    # empilha constante (operando: índice em consts)
+STORE = 2         # desempilha em variável (operando: slot)
+ADD = 3
+SUB = 4
+MUL = 5
+DIV = 6
+JUMP_IF_EQ = 7    # desempilha dois valores, compara e salta se verdadeiro
+JUMP_IF_NE = 8    # (operando: offset)
+JUMP_IF_LT = 9
+JUMP_IF_GT = 10
+JUMP_IF_LE = 11
+JUMP_IF_GE = 12
+ADD_CONST = 13    # topo da pilha op constante (operando: índice em consts)
+JUMP = 14         # salto incondicional (operando: offset)
+GOSUB = 15        # empilha retorno e salta (operando: offset)
+RETURN = 16
+PRINT = 17        # desempilha N itens e imprime (operando: N)
+INPUT = 18        # lê inteiro para variável (operando: slot)
+END = 19
+HALT = 20         # fim do fluxo de instruções (sem mensagem)
+INC = 21          # soma constante a variável (operando: slot | índice em consts << 5)
+DIM = 22          # desempilha tamanho e aloca o array (operando: slot)
+ALOAD = 23        # troca o índice no topo pelo valor do array (operando: slot)
+ASTORE = 24       # desempilha valor e índice e escreve no array (operando: slot)
+AINPUT = 25       # desempilha índice e lê inteiro para o array (operando: slot)
+SUB_CONST = 26
+MUL_CONST = 27
+DIV_CONST = 28    # constante diferente de zero
+
+OPNAMES = [
+    "LOAD", "PUSH_CONST", "STORE", "ADD", "SUB", "MUL", "DIV",
+    "JUMP_IF_EQ", "JUMP_IF_NE", "JUMP_IF_LT", "JUMP_IF_GT", "JUMP_IF_LE", "JUMP_IF_GE",
+    "ADD_CONST", "JUMP", "GOSUB", "RETURN", "PRINT", "INPUT", "END", "HALT",
+    "INC", "DIM", "ALOAD", "ASTORE", "AINPUT", "SUB_CONST", "MUL_CONST", "DIV_CONST",
+]
+
+ARITH_OPS = {"PLUS": ADD, "MINUS": SUB, "MUL": MUL, "DIV": DIV}
+CONST_OPS = {"PLUS": ADD_CONST, "MINUS": SUB_CONST, "MUL": MUL_CONST, "DIV": DIV_CONST}
+REL_OPS = {"EQ": JUMP_IF_EQ, "NE": JUMP_IF_NE, "LT": JUMP_IF_LT,
+           "GT": JUMP_IF_GT, "LE": JUMP_IF_LE, "GE": JUMP_IF_GE}
+JUMP_OPCODES = (JUMP, GOSUB) + tuple(REL_OPS.values())
+
+# Instruções por bloco de contagem de passos: entre blocos a VM soma
+# os passos e atende cancel() mesmo sem limite de passos
+DISPATCH_CHUNK = 10000
+
+
+# ============================================================
+# Programa compilado: arrays de instruções + tabelas auxiliares
+# --------------------------------------------------------
+class Code:
+    def __init__(self):
+        self.ops = array("i")     # opcode de cada instrução
+        self.args = array("i")    # operando de cada instrução
+        self.lines = array("i")   # linha do fonte de cada instrução
+        self.consts = []          # constantes numéricas e strings
+        self.line_offsets = {}    # número da linha -> offset da 1ª instrução
+
+    def __len__(self):
+        return len(self.ops)
+
+
+# ============================================================
+# Compilador: AST -> Code
+# --------------------------------------------------------
+class Compiler:
+    def __init__(self):
+        self.code = Code()
+        self.const_index = {}
+        self.fixups = []          # (offset, linha destino, comando, linha fonte)
+        self.line_num = 0
+
+    def compile(self, ast):
+        for _, line_num, stmt_list in ast:
+            self.line_num = line_num
+            self.code.line_offsets[line_num] = len(self.code)
+            for stmt in stmt_list:
+                self.compile_stmt(stmt)
+        self.emit(HALT)
+
+        # Resolve os saltos: linhas inexistentes são erro de carga
+        for offset, target, kind, source in self.fixups:
+            if target not in self.code.line_offsets:
+                raise Exception(f"Linha {target} não encontrada para {kind} (linha {source})")
+            self.code.args[offset] = self.code.line_offsets[target]
+        return self.code
+
+    def emit(self, op, arg=0):
+        self.code.ops.append(op)
+        self.code.args.append(arg)
+        self.code.lines.append(self.line_num)
+
+    def emit_jump(self, op, kind, target):
+        self.fixups.append((len(self.code), target, kind, self.line_num))
+        self.emit(op)
+
+    def const(self, value):
+        key = (type(value), value)
+        if key not in self.const_index:
+            self.const_index[key] = len(self.code.consts)
+            self.code.consts.append(value)
+        return self.const_index[key]
+
+    # ========================================================
+    # Statements
+    # --------------------------------------------------------
+    def compile_stmt(self, stmt):
+        t = stmt[0]
+
+        if t == "LET":
+            _, var, expr = stmt
+            self.compile_expr(expr)
+            self.emit(STORE, slot(var))
+
+        elif t == "INC":
+            _, var, amount = stmt
+            self.emit(INC, slot(var) | self.const(amount) << 5)
+
+        elif t == "PRINT":
+            _, items = stmt
+            for item in items:
+                if item[0] == "STR":
+                    self.emit(PUSH_CONST, self.const(item[1]))
+                else:
+                    self.compile_expr(item)
+            self.emit(PRINT, len(items))
+
+        elif t == "INPUT":
+            _, var = stmt
+            self.emit(INPUT, slot(var))
+
+        elif t == "DIM":
+            _, var, size = stmt
+            self.compile_expr(size)
+            self.emit(DIM, slot(var))
+
+        elif t == "LET_INDEX":
+            _, var, index, expr = stmt
+            self.compile_expr(index)
+            self.compile_expr(expr)
+            self.emit(ASTORE, slot(var))
+
+        elif t == "INPUT_INDEX":
+            _, var, index = stmt
+            self.compile_expr(index)
+            self.emit(AINPUT, slot(var))
+
+        elif t == "IF":
+            _, cond, line_num = stmt
+            self.emit_jump(self.compile_cond(cond), "IF", line_num)
+
+        elif t == "IFELSE":
+            _, cond, then_line, else_line = stmt
+            self.emit_jump(self.compile_cond(cond), "IF", then_line)
+            self.emit_jump(JUMP, "GOTO", else_line)
+
+        elif t in ("GOTO", "GOSUB"):
+            _, line_num = stmt
+            self.emit_jump(JUMP if t == "GOTO" else GOSUB, t, line_num)
+
+        elif t == "RETURN":
+            self.emit(RETURN)
+
+        elif t == "END":
+            self.emit(END)
+
+        elif t == "REM":
+            pass  # comentários não geram código
+
+        else:
+            raise Exception(f"Statement inesperado: {stmt}")
+
+    # ========================================================
+    # Expressões e condições (pós-ordem, máquina de pilha)
+    # --------------------------------------------------------
+    def compile_expr(self, expr):
+        if expr[0] == "NUMBER":
+            self.emit(PUSH_CONST, self.const(expr[1]))
+        elif expr[0] == "ID":
+            self.emit(LOAD, slot(expr[1]))
+        elif expr[0] == "INDEX":
+            self.compile_expr(expr[2])
+            self.emit(ALOAD, slot(expr[1]))
+        elif expr[0] == "BINOP":
+            _, op, left, right = expr
+            self.compile_expr(left)
+            if right[0] == "NUMBER" and not (op == "DIV" and right[1] == 0):
+                self.emit(CONST_OPS[op], self.const(right[1]))
+            else:
+                self.compile_expr(right)
+                self.emit(ARITH_OPS[op])
+        else:
+            raise Exception(f"Expr inesperada: {expr}")
+
+    # Empilha os dois lados; devolve o opcode de salto da comparação
+    def compile_cond(self, cond):
+        _, left, op, right = cond
+        if op not in REL_OPS:
+            raise Exception(f"Operador relacional inesperado: {op}")
+        self.compile_expr(left)
+        self.compile_expr(right)
+        return REL_OPS[op]
+
+
+def compile_program(ast):
+    return Compiler().compile(ast)
+
+
+# ============================================================
+# Disassembler: listagem legível do bytecode
+# --------------------------------------------------------
+def disassemble(code):
+    labels = {}
+    for num, offset in code.line_offsets.items():
+        labels.setdefault(offset, []).append(num)
+    out = []
+    for pc in range(len(code)):
+        for num in labels.get(pc, ()):
+            out.append(f"; linha {num}")
+        op, arg = code.ops[pc], code.args[pc]
+        text = f"{pc:>6}  {OPNAMES[op]:<13}"
+        if op in (LOAD, STORE, INPUT, DIM, ALOAD, ASTORE, AINPUT):
+            text += f"{arg:>6}  ({VAR_NAMES[arg]})"
+        elif op in (PUSH_CONST, ADD_CONST, SUB_CONST, MUL_CONST, DIV_CONST):
+            text += f"{arg:>6}  ({code.consts[arg]!r})"
+        elif op in JUMP_OPCODES:
+            text += f"{arg:>6}  (-> linha {code.lines[arg]})"
+        elif op == PRINT:
+            text += f"{arg:>6}"
+        elif op == INC:
+            text += f"{arg:>6}  ({VAR_NAMES[arg & 31]} += {code.consts[arg >> 5]!r})"
+        out.append(text.rstrip())
+    return "\n".join(out)
+
+
+# ============================================================
+# Máquina virtual
+# --------------------------------------------------------
+class BytecodeVM(Interpreter):
+    def __init__(self, ast, output=None, input=None):
+        super().__init__(ast, output, input)
+        self.code = compile_program(ast)
+
+    # ========================================================
+    # Laço de despacho
+    # --------------------------------------------------------
+    # Aqui cada passo de max_steps é uma instrução executada
+    # --------------------------------------------------------
+    def run(self, max_steps=None):
+        try:
+            self.dispatch(max_steps)
+        finally:
+            self.output.flush()
+
+    def dispatch(self, max_steps=None):
+        # (opcode, operando) em uma lista de tuplas: um acesso por
+        # instrução, mais barato que ler os dois arrays
+        instructions = list(zip(self.code.ops, self.code.args))
+        consts = self.code.consts
+        v = self.slots
+        calls = self.call_stack
+        write_line = self.output.write_line
+        read = self.input.read
+        arrays = self.arrays
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+
+        # Os passos são contados por blocos de DISPATCH_CHUNK
+        # instruções (ou o que falta até max_steps): o laço interno
+        # não testa limite nenhum, e `done` diz quantas do bloco já
+        # rodaram quando a execução termina ou dá erro no meio dele
+        done = 0
+        try:
+            while True:
+                if self.stop_requested:
+                    raise ExecutionStopped("Execução interrompida")
+                chunk = DISPATCH_CHUNK
+                if max_steps is not None:
+                    if self.steps >= max_steps:
+                        raise ExecutionStopped(f"Limite de {max_steps} passos excedido")
+                    chunk = min(chunk, max_steps - self.steps)
+                for done in range(1, chunk + 1):
+                    op, arg = instructions[pc]
+                    pc += 1
+
+                    if op == LOAD:
+                        push(v[arg])
+                    elif op == PUSH_CONST:
+                        push(consts[arg])
+                    elif op == STORE:
+                        v[arg] = pop()
+                    elif JUMP_IF_EQ <= op <= JUMP_IF_GE:
+                        right = pop()
+                        left = pop()
+                        if op == JUMP_IF_LT:
+                            if left < right:
+                                pc = arg
+                        elif op == JUMP_IF_GT:
+                            if left > right:
+                                pc = arg
+                        elif op == JUMP_IF_EQ:
+                            if left == right:
+                                pc = arg
+                        elif op == JUMP_IF_NE:
+                            if left != right:
+                                pc = arg
+                        elif op == JUMP_IF_LE:
+                            if left <= right:
+                                pc = arg
+                        elif left >= right:
+                            pc = arg
+                    elif op == INC:
+                        v[arg & 31] += consts[arg >> 5]
+                    elif op == ADD_CONST:
+                        stack[-1] += consts[arg]
+                    elif op == ADD:
+                        right = pop()
+                        stack[-1] += right
+                    elif op == JUMP:
+                        pc = arg
+                    elif op == MUL_CONST:
+                        stack[-1] *= consts[arg]
+                    elif op == SUB_CONST:
+                        stack[-1] -= consts[arg]
+                    elif op == MUL:
+                        right = pop()
+                        stack[-1] *= right
+                    elif op == SUB:
+                        right = pop()
+                        stack[-1] -= right
+                    elif op == DIV_CONST:
+                        stack[-1] //= consts[arg]
+                    elif op == DIV:
+                        right = pop()
+                        if right == 0:
+                            raise Exception("Divisão por zero")
+                        stack[-1] //= right
+                    elif op == ALOAD:
+                        stack[-1] = arrays.get(arg, stack[-1])
+                    elif op == ASTORE:
+                        value = pop()
+                        arrays.put(arg, pop(), value)
+                    elif op == GOSUB:
+                        calls.append(pc)  # retorna ao statement seguinte
+                        pc = arg
+                    elif op == RETURN:
+                        if not calls:
+                            raise Exception("RETURN sem GOSUB correspondente")
+                        pc = calls.pop()
+                    elif op == PRINT:
+                        items = stack[-arg:]
+                        del stack[-arg:]
+                        write_line(" ".join([str(item) for item in items]))
+                    elif op == INPUT:
+                        v[arg] = read(VAR_NAMES[arg], self.output)
+                    elif op == DIM:
+                        arrays.dim(arg, pop())
+                    elif op == AINPUT:
+                        index = pop()
+                        arrays.check_index(arg, index)
+                        arrays.put(arg, index, read(f"{VAR_NAMES[arg]}({index})", self.output))
+                    elif op == END:
+                        write_line("Fim do programa.")
+                        return
+                    else:  # HALT
+                        return
+                self.steps += done
+                done = 0
+        finally:
+            self.steps += done
@@ -0,0 +1,116 @@
+# cache.py
+# -----------------------------
+# Cache em disco de programas já analisados
+# Guarda a AST validada pelo Parser em um diretório de cache,
+# com chave = hash do código-fonte + versão do formato. Em um
+# acerto, lexer e Parser não rodam. O diretório tem tamanho
+# máximo e os arquivos menos usados recentemente são removidos.
+# -----------------------------
+
+import hashlib
+import marshal
+import os
+import sys
+
+# Mude ao alterar o formato da AST: invalida todo o cache antigo
+FORMAT_VERSION = 1
+
+DEFAULT_DIR = os.environ.get("TINYBASIC_CACHE_DIR",
+                             os.path.join(os.path.expanduser("~"), ".cache", "tinybasic"))
+DEFAULT_MAX_BYTES = 64 * 2**20    # 64 MiB
+SUFFIX = ".tbc"
+
+
+class ProgramCache:
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    # ========================================================
+    # Chaves: o marshal muda entre versões do Python, então a
+    # versão do interpretador também entra no hash
+    # --------------------------------------------------------
+    def new_hash(self):
+        h = hashlib.sha256()
+        h.update(f"tinybasic:{FORMAT_VERSION}:{sys.version_info[0]}.{sys.version_info[1]}"
+                 f":{marshal.version}\n".encode())
+        return h
+
+    def source_key(self, source):
+        h = self.new_hash()
+        h.update(source.encode("utf-8"))
+        return h.hexdigest()
+
+    def data_key(self, data):
+        # Bytes já carregados (bytes, mmap): mesma chave de file_key
+        h = self.new_hash()
+        h.update(data)
+        return h.hexdigest()
+
+    def file_key(self, path):
+        # Lê o arquivo em blocos, sem carregar tudo na memória
+        h = self.new_hash()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    # ========================================================
+    # Busca: devolve a AST ou None (arquivo ausente ou corrompido)
+    # --------------------------------------------------------
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                version, ast = marshal.load(f)
+            if version != FORMAT_VERSION:
+                return None
+            os.utime(path)   # marca como usado recentemente (LRU)
+            return ast
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    # ========================================================
+    # Grava a AST (escrita atômica) e aplica o limite de tamanho
+    # --------------------------------------------------------
+    def put(self, key, ast):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.path(key)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                marshal.dump((FORMAT_VERSION, ast), f)
+            os.replace(tmp, path)
+            self.evict()
+        except OSError:
+            pass  # cache é só otimização: falhas de escrita são ignoradas
+
+    def evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(SUFFIX):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+
+        # Remove os menos usados recentemente até caber no limite
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(SUFFIX):
+                    os.remove(os.path.join(self.directory, name))
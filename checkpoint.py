@@ -0,0 +1,133 @@
+# checkpoint.py
+# -----------------------------
+# Checkpoint e retomada de execuções longas do TinyBasic
+# A execução é feita em fatias de N passos (Interpreter.step); ao
+# fim de cada fatia o estado completo vai para um arquivo binário:
+#   - próxima linha (pc) e passos executados
+#   - variáveis A-Z, pilha de GOSUB e arrays (DIM)
+#   - posição na entrada (ListInput), se houver
+# O arquivo começa com um cabeçalho fixo (magic, versão e o hash
+# do programa: fonte + AST executada, já que --sort e --opt-level
+# mudam os índices das linhas) seguido do estado em marshal. Com
+# SIGTERM o estado também é gravado, no fim da linha em execução.
+# A escrita é atômica: um arquivo pela metade nunca substitui o
+# checkpoint anterior.
+# -----------------------------
+
+import hashlib
+import marshal
+import os
+import signal
+import struct
+from array import array
+
+from interpreter import ExecutionStopped, STEP_DONE
+
+MAGIC = b"TBCK"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sH32s")     # magic, versão, sha256 do programa
+DEFAULT_EVERY = 100_000               # passos entre checkpoints
+
+
+def program_hash(source, ast):
+    # source: bytes (ou mmap) do fonte; ast: AST que vai ser executada
+    h = hashlib.sha256()
+    h.update(source)
+    h.update(marshal.dumps(ast))
+    return h.digest()
+
+
+class Checkpoint:
+    def __init__(self, path, digest, every=DEFAULT_EVERY):
+        if every <= 0:
+            raise Exception("O intervalo entre checkpoints deve ser positivo")
+        self.path = path
+        self.digest = digest          # program_hash() do programa em execução
+        self.every = every
+        self.saves = 0                # checkpoints gravados nesta execução
+        self.terminated = False       # SIGTERM recebido
+
+    # ========================================================
+    # Gravação: cabeçalho + estado, em arquivo temporário
+    # renomeado por cima do anterior
+    # --------------------------------------------------------
+    def save(self, interpreter):
+        store = interpreter.arrays
+        arrays = [(s, values.tobytes()) for s, values in enumerate(store.data)
+                  if values is not None]
+        state = (interpreter.pc, interpreter.steps, interpreter.slots,
+                 interpreter.call_stack, arrays, sorted(store.loaded),
+                 getattr(interpreter.input, "position", None))
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.digest))
+            marshal.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.saves += 1
+
+    # ========================================================
+    # Leitura: recusa arquivos de outro programa ou corrompidos
+    # --------------------------------------------------------
+    def restore(self, interpreter):
+        try:
+            with open(self.path, "rb") as f:
+                magic, version, digest = HEADER.unpack(f.read(HEADER.size))
+                if magic != MAGIC or version != FORMAT_VERSION:
+                    raise Exception(f"{self.path} não é um checkpoint TinyBasic (versão {FORMAT_VERSION})")
+                if digest != self.digest:
+                    raise Exception(f"{self.path} foi gravado por outro programa "
+                                    f"(ou com outras opções de execução)")
+                pc, steps, slots, call_stack, arrays, loaded, position = marshal.load(f)
+        except (struct.error, EOFError, ValueError, TypeError):
+            raise Exception(f"Checkpoint {self.path} corrompido") from None
+
+        interpreter.pc, interpreter.stmt_index = pc, 0
+        interpreter.steps = steps
+        interpreter.slots[:] = slots
+        interpreter.call_stack[:] = call_stack
+        store = interpreter.arrays
+        store.data = [None] * len(store.data)
+        for s, data in arrays:
+            values = array("q")
+            values.frombytes(data)
+            store.data[s] = values
+        store.loaded = set(loaded)
+        if position is not None and hasattr(interpreter.input, "position"):
+            interpreter.input.position = position
+
+    # ========================================================
+    # Executa com checkpoints a cada `every` passos. Ao terminar
+    # normalmente o arquivo é apagado; em erro fica o último.
+    # --------------------------------------------------------
+    def run(self, interpreter, max_steps=None):
+        def on_sigterm(signum, frame):
+            self.terminated = True
+            interpreter.cancel()      # para no início da próxima linha
+
+        previous = signal.signal(signal.SIGTERM, on_sigterm)
+        try:
+            while True:
+                count = self.every
+                if max_steps is not None:
+                    if interpreter.steps >= max_steps:
+                        raise ExecutionStopped(f"Limite de {max_steps} passos excedido")
+                    count = min(count, max_steps - interpreter.steps)
+                try:
+                    state = interpreter.step(count)
+                except ExecutionStopped:
+                    if not self.terminated:
+                        raise
+                    self.save(interpreter)
+                    raise ExecutionStopped(f"Interrompido (SIGTERM) após {interpreter.steps} "
+                                           f"passos; checkpoint em {self.path}") from None
+                if state == STEP_DONE:
+                    break
+                self.save(interpreter)
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
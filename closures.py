@@ -0,0 +1,326 @@
+# closures.py
+# -----------------------------
+# Backend de execução por closures do TinyBasic
+# Compila cada linha da AST em closures Python uma única vez,
+# com operadores, variáveis e destinos de salto já resolvidos.
+# A execução não compara mais strings a cada statement.
+# -----------------------------
+
+from interpreter import Interpreter
+from resolver import slot
+
+
+# ============================================================
+# Fábricas de closures para operadores.
+# v = lista de slots, a/b = índices de variáveis, c = constante
+# l/r = closures dos operandos esquerdo e direito
+# ============================================================
+_ARITH = {
+    "PLUS":  lambda l, r: lambda: l() + r(),
+    "MINUS": lambda l, r: lambda: l() - r(),
+    "MUL":   lambda l, r: lambda: l() * r(),
+}
+_ARITH_VAR_CONST = {
+    "PLUS":  lambda v, a, c: lambda: v[a] + c,
+    "MINUS": lambda v, a, c: lambda: v[a] - c,
+    "MUL":   lambda v, a, c: lambda: v[a] * c,
+}
+_ARITH_VAR_VAR = {
+    "PLUS":  lambda v, a, b: lambda: v[a] + v[b],
+    "MINUS": lambda v, a, b: lambda: v[a] - v[b],
+    "MUL":   lambda v, a, b: lambda: v[a] * v[b],
+}
+
+_REL = {
+    "EQ": lambda l, r: lambda: l() == r(),
+    "NE": lambda l, r: lambda: l() != r(),
+    "LT": lambda l, r: lambda: l() < r(),
+    "GT": lambda l, r: lambda: l() > r(),
+    "LE": lambda l, r: lambda: l() <= r(),
+    "GE": lambda l, r: lambda: l() >= r(),
+}
+_REL_VAR_CONST = {
+    "EQ": lambda v, a, c: lambda: v[a] == c,
+    "NE": lambda v, a, c: lambda: v[a] != c,
+    "LT": lambda v, a, c: lambda: v[a] < c,
+    "GT": lambda v, a, c: lambda: v[a] > c,
+    "LE": lambda v, a, c: lambda: v[a] <= c,
+    "GE": lambda v, a, c: lambda: v[a] >= c,
+}
+_REL_VAR_VAR = {
+    "EQ": lambda v, a, b: lambda: v[a] == v[b],
+    "NE": lambda v, a, b: lambda: v[a] != v[b],
+    "LT": lambda v, a, b: lambda: v[a] < v[b],
+    "GT": lambda v, a, b: lambda: v[a] > v[b],
+    "LE": lambda v, a, b: lambda: v[a] <= v[b],
+    "GE": lambda v, a, b: lambda: v[a] >= v[b],
+}
+
+
+class ClosureInterpreter(Interpreter):
+    def __init__(self, ast, output=None, input=None):
+        super().__init__(ast, output, input)  # monta line_map, call_stack e slots
+        self.code = [self.compile_line(i, line) for i, line in enumerate(ast)]
+
+    # ========================================================
+    # Executa o programa compilado
+    # Cada linha compilada devolve o índice da próxima linha
+    # --------------------------------------------------------
+    def run(self, max_steps=None):
+        code = self.code
+        n = len(code)
+        i = 0
+        try:
+            if max_steps is None:
+                while 0 <= i < n:
+                    i = code[i]()
+            else:
+                while 0 <= i < n:
+                    self.check_stop(max_steps)
+                    self.steps += 1
+                    i = code[i]()
+        finally:
+            self.output.flush()
+
+    # ========================================================
+    # Compila uma linha inteira em uma única closure
+    # --------------------------------------------------------
+    def compile_line(self, index, line):
+        _, line_num, stmt_list = line
+        if not stmt_list:
+            nxt = index + 1
+            return lambda: nxt
+
+        # Só o último statement cai para a próxima linha;
+        # os anteriores devolvem None para continuar na mesma linha
+        head = [self.compile_stmt(stmt, index, None) for stmt in stmt_list[:-1]]
+        last = self.compile_stmt(stmt_list[-1], index, index + 1)
+        if not head:
+            return last
+
+        def run_line():
+            for fn in head:
+                result = fn()
+                if result is not None:
+                    return result
+            return last()
+        return run_line
+
+    # ========================================================
+    # Compila um statement individual
+    # `nxt` é o valor devolvido quando a execução segue em frente
+    # --------------------------------------------------------
+    def compile_stmt(self, stmt, current_index, nxt):
+        t = stmt[0]
+        v = self.slots
+        stack = self.call_stack
+        write_line = self.output.write_line
+
+        if t == "LET":
+            _, var, expr = stmt
+            s = slot(var)
+            value = self.compile_expr(expr)
+
+            def let():
+                v[s] = value()
+                return nxt
+            return let
+
+        elif t == "INC":
+            _, var, amount = stmt
+            s = slot(var)
+
+            def inc():
+                v[s] += amount
+                return nxt
+            return inc
+
+        elif t == "PRINT":
+            _, items = stmt
+            parts = [self.compile_print_item(item) for item in items]
+
+            def print_():
+                write_line(" ".join([part() for part in parts]))
+                return nxt
+            return print_
+
+        elif t == "INPUT":
+            _, var = stmt
+            s = slot(var)
+            read = self.input.read
+            output = self.output
+
+            def input_():
+                v[s] = read(var, output)
+                return nxt
+            return input_
+
+        elif t == "DIM":
+            _, var, size = stmt
+            s = slot(var)
+            size = self.compile_expr(size)
+            dim = self.arrays.dim
+
+            def dim_():
+                dim(s, size())
+                return nxt
+            return dim_
+
+        elif t == "LET_INDEX":
+            _, var, index, expr = stmt
+            s = slot(var)
+            index = self.compile_expr(index)
+            value = self.compile_expr(expr)
+            put = self.arrays.put
+
+            def let_index():
+                put(s, index(), value())
+                return nxt
+            return let_index
+
+        elif t == "INPUT_INDEX":
+            _, var, index = stmt
+            s = slot(var)
+            index = self.compile_expr(index)
+            arrays = self.arrays
+            read = self.input.read
+            output = self.output
+
+            def input_index():
+                i = index()
+                arrays.check_index(s, i)
+                arrays.put(s, i, read(f"{var}({i})", output))
+                return nxt
+            return input_index
+
+        elif t == "IF":
+            _, cond, line_num = stmt
+            test = self.compile_cond(cond)
+            target = self.line_map.get(line_num)
+            if target is None:
+                def if_missing():
+                    if test():
+                        raise Exception(f"Linha {line_num} não encontrada para IF")
+                    return nxt
+                return if_missing
+            return lambda: target if test() else nxt
+
+        elif t == "IFELSE":
+            _, cond, then_line, else_line = stmt
+            test = self.compile_cond(cond)
+            then_target = self.line_map.get(then_line)
+            else_target = self.line_map.get(else_line)
+            if then_target is None or else_target is None:
+                def ifelse_missing():
+                    if test():
+                        line_num, kind, target = then_line, "IF", then_target
+                    else:
+                        line_num, kind, target = else_line, "GOTO", else_target
+                    if target is None:
+                        raise Exception(f"Linha {line_num} não encontrada para {kind}")
+                    return target
+                return ifelse_missing
+            return lambda: then_target if test() else else_target
+
+        elif t == "GOTO":
+            _, line_num = stmt
+            target = self.line_map.get(line_num)
+            if target is None:
+                def goto_missing():
+                    raise Exception(f"Linha {line_num} não encontrada para GOTO")
+                return goto_missing
+            return lambda: target
+
+        elif t == "GOSUB":
+            _, line_num = stmt
+            target = self.line_map.get(line_num)
+            return_index = current_index + 1
+
+            def gosub():
+                stack.append(return_index)  # salva retorno
+                if target is None:
+                    raise Exception(f"Linha {line_num} não encontrada para GOSUB")
+                return target
+            return gosub
+
+        elif t == "RETURN":
+            def return_():
+                if stack:
+                    return stack.pop()
+                raise Exception("RETURN sem GOSUB correspondente")
+            return return_
+
+        elif t == "END":
+            def end():
+                write_line("Fim do programa.")
+                return -1
+            return end
+
+        elif t == "REM":
+            return lambda: nxt
+
+        else:
+            raise Exception(f"Statement inesperado: {stmt}")
+
+    def compile_print_item(self, item):
+        if item[0] == "STR":
+            text = item[1]
+            return lambda: text
+        value = self.compile_expr(item)
+        return lambda: str(value())
+
+    # ========================================================
+    # Compila expressões aritméticas
+    # --------------------------------------------------------
+    def compile_expr(self, expr):
+        v = self.slots
+        if expr[0] == "NUMBER":
+            c = expr[1]
+            return lambda: c
+        elif expr[0] == "ID":
+            a = slot(expr[1])
+            return lambda: v[a]
+        elif expr[0] == "INDEX":
+            a = slot(expr[1])
+            index = self.compile_expr(expr[2])
+            get = self.arrays.get
+            return lambda: get(a, index())
+        elif expr[0] == "BINOP":
+            _, op, left, right = expr
+            # Casos especializados: variável op constante, variável op variável
+            if left[0] == "ID" and right[0] == "NUMBER":
+                a, c = slot(left[1]), right[1]
+                if op in _ARITH_VAR_CONST:
+                    return _ARITH_VAR_CONST[op](v, a, c)
+                if op == "DIV" and c != 0:
+                    return lambda: v[a] // c
+            elif left[0] == "ID" and right[0] == "ID" and op in _ARITH_VAR_VAR:
+                return _ARITH_VAR_VAR[op](v, slot(left[1]), slot(right[1]))
+
+            l = self.compile_expr(left)
+            r = self.compile_expr(right)
+            if op in _ARITH:
+                return _ARITH[op](l, r)
+            elif op == "DIV":
+                def div():
+                    left_val = l()
+                    right_val = r()
+                    if right_val == 0:
+                        raise Exception("Divisão por zero")
+                    return left_val // right_val
+                return div
+        raise Exception(f"Expr inesperada: {expr}")
+
+    # ========================================================
+    # Compila condições IF
+    # --------------------------------------------------------
+    def compile_cond(self, cond):
+        _, left, op, right = cond
+        if op not in _REL:
+            raise Exception(f"Operador relacional inesperado: {op}")
+        v = self.slots
+        if left[0] == "ID" and right[0] == "NUMBER":
+            return _REL_VAR_CONST[op](v, slot(left[1]), right[1])
+        if left[0] == "ID" and right[0] == "ID":
+            return _REL_VAR_VAR[op](v, slot(left[1]), slot(right[1]))
+        return _REL[op](self.compile_expr(left), self.compile_expr(right))
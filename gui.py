@@ -1,9 +1,52 @@
 # gui.py
+import queue
+import sys
+import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, simpledialog
-from lexer import lexer
-from parser import Parser
-from interpreter import Interpreter
+from backends import BACKENDS
+from hooks import DebugHooks
+from incremental import IncrementalFrontEnd
+from interpreter import ExecutionStopped
+from streams import BufferedOutput, FLUSH_LINE, INPUT_ERROR, ValueInput
+
+
+# ============================================================
+# Saída e entrada do Interpreter, que roda em uma thread separada.
+# Tudo passa por uma fila lida pela thread da interface em lotes
+# (root.after), pois widgets Tk só podem ser usados por ela.
+# Mensagens: ("output", texto), ("input", var, resposta),
+# ("pause", linha, motivo), ("done", erro)
+# --------------------------------------------------------
+class QueueStream:
+    # Stream mínimo (write/flush) que envia o texto para a fila
+    def __init__(self, messages):
+        self.messages = messages
+
+    def write(self, text):
+        self.messages.put(("output", text))
+
+    def flush(self):
+        pass
+
+
+class QueueInput(ValueInput):
+    # Pede o valor de INPUT à thread da interface e espera a resposta;
+    # conversão e erros seguem a política de ValueInput, como no terminal
+    def __init__(self, messages, on_error=INPUT_ERROR):
+        super().__init__(on_error)
+        self.messages = messages
+
+    def next_value(self, var, output):
+        output.flush()
+        reply = queue.Queue(maxsize=1)
+        self.messages.put(("input", var, reply))
+        return reply.get()  # cancelado (None) conta como entrada esgotada
+
+    def invalid(self, var, value, output):
+        output.write_line("Valor inválido: digite um número inteiro")
+        output.flush()
+
 
 class TinyBasicGUI:
     def __init__(self, root):
@@ -16,16 +59,59 @@ class TinyBasicGUI:
         frame_top.pack(fill=tk.X, padx=10, pady=5)
 
         tk.Button(frame_top, text="Abrir Programa", command=self.load_file).pack(side=tk.LEFT, padx=5)
-        tk.Button(frame_top, text="Rodar", command=self.run_program).pack(side=tk.LEFT, padx=5)
+        self.run_button = tk.Button(frame_top, text="Rodar", command=self.run_program)
+        self.run_button.pack(side=tk.LEFT, padx=5)
+        self.stop_button = tk.Button(frame_top, text="Parar", command=self.stop_program,
+                                     state=tk.DISABLED)
+        self.stop_button.pack(side=tk.LEFT, padx=5)
+
+        # Depuração (backend tree): passo a passo, breakpoints e watchpoints
+        tk.Button(frame_top, text="Depurar", command=self.debug_program).pack(side=tk.LEFT, padx=5)
+        self.step_button = tk.Button(frame_top, text="Passo", command=self.step_program,
+                                     state=tk.DISABLED)
+        self.step_button.pack(side=tk.LEFT, padx=5)
+        self.continue_button = tk.Button(frame_top, text="Continuar",
+                                         command=self.continue_program, state=tk.DISABLED)
+        self.continue_button.pack(side=tk.LEFT, padx=5)
+        tk.Label(frame_top, text="Breakpoints:").pack(side=tk.LEFT, padx=(15, 0))
+        self.breakpoints = tk.StringVar()
+        tk.Entry(frame_top, textvariable=self.breakpoints, width=10).pack(side=tk.LEFT)
+        tk.Label(frame_top, text="Observar:").pack(side=tk.LEFT, padx=(10, 0))
+        self.watch = tk.StringVar()
+        tk.Entry(frame_top, textvariable=self.watch, width=6).pack(side=tk.LEFT)
+
+        # Limite de passos por execução (0 = sem limite)
+        tk.Label(frame_top, text="Limite de passos:").pack(side=tk.LEFT, padx=(15, 0))
+        self.max_steps = tk.StringVar(value="1000000")
+        tk.Entry(frame_top, textvariable=self.max_steps, width=10).pack(side=tk.LEFT)
+
+        # Seleção do backend de execução
+        self.backend = tk.StringVar(value="tree")
+        tk.Label(frame_top, text="Backend:").pack(side=tk.LEFT, padx=(15, 0))
+        tk.OptionMenu(frame_top, self.backend, *sorted(BACKENDS)).pack(side=tk.LEFT)
 
         # Áreas de texto
         self.code_area = self.create_text_area("Código Fonte")
         self.tokens_area = self.create_text_area("Tokens")
         self.ast_area = self.create_text_area("AST")
         self.output_area = self.create_text_area("Saída do Programa")
+        self.code_area.tag_configure("current_line", background="#fff3a0")
 
         self.program_code = ""
 
+        # Front end incremental: só linhas editadas são reanalisadas
+        self.frontend = IncrementalFrontEnd()
+        self.pane_lines = {self.tokens_area: [], self.ast_area: []}
+        self.refresh_job = None
+        self.code_area.bind("<<Modified>>", self.on_code_modified)
+
+        # Execução em segundo plano
+        self.messages = queue.Queue()
+        self.interpreter = None
+        self.hooks = None                  # DebugHooks da execução atual
+        self.resume = threading.Event()    # libera a thread parada em uma pausa
+        self.editor_lines = {}             # número da linha BASIC -> linha do editor
+
     def create_text_area(self, label):
         frame = tk.Frame(self.root)
         frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -43,69 +129,200 @@ class TinyBasicGUI:
             self.code_area.delete("1.0", tk.END)
             self.code_area.insert(tk.END, self.program_code)
 
-    def run_program(self):
-        if not self.program_code:
-            self.program_code = self.code_area.get("1.0", tk.END).strip()
-        if not self.program_code:
+    # ========================================================
+    # Atualização incremental dos painéis de tokens e AST
+    # --------------------------------------------------------
+    def on_code_modified(self, event=None):
+        # Agrupa várias teclas seguidas em uma única atualização
+        self.code_area.edit_modified(False)
+        if self.refresh_job is not None:
+            self.root.after_cancel(self.refresh_job)
+        self.refresh_job = self.root.after(300, self.refresh_panes)
+
+    def refresh_panes(self):
+        self.refresh_job = None
+        # Só o fim é aparado: linhas em branco no início contam para o
+        # número das linhas (tokens e destaque do depurador)
+        self.program_code = self.code_area.get("1.0", tk.END).rstrip()
+        self.frontend.update(self.program_code)
+        self.update_area(self.tokens_area, self.frontend.token_lines())
+        self.update_area(self.ast_area, self.frontend.ast_lines())
+
+    def update_area(self, area, new_lines):
+        # Troca só o trecho que mudou: mantém o prefixo e o sufixo iguais
+        old_lines = self.pane_lines[area]
+        limit = min(len(old_lines), len(new_lines))
+        prefix = 0
+        while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while (suffix < limit - prefix and
+               old_lines[len(old_lines) - 1 - suffix] == new_lines[len(new_lines) - 1 - suffix]):
+            suffix += 1
+
+        old_end = len(old_lines) - suffix
+        middle = new_lines[prefix:len(new_lines) - suffix]
+        if old_end > prefix:
+            area.delete(f"{prefix + 1}.0", f"{old_end + 1}.0")
+        if middle:
+            area.insert(f"{prefix + 1}.0", "\n".join(middle) + "\n")
+        self.pane_lines[area] = new_lines
+
+    # ========================================================
+    # Execução: o Interpreter roda fora da thread da interface
+    # --------------------------------------------------------
+    def run_program(self, stepping=False):
+        if self.interpreter is not None:
+            return  # já existe uma execução em andamento
+        if self.refresh_job is not None:
+            self.root.after_cancel(self.refresh_job)
+        self.refresh_panes()
+        if not self.program_code.strip():
             messagebox.showerror("Erro", "Nenhum código carregado.")
             return
 
         try:
-            # Lexer
-            tokens = lexer(self.program_code)
-            self.tokens_area.delete("1.0", tk.END)
-            for t in tokens:
-                self.tokens_area.insert(tk.END, str(t) + "\n")
-
-            # Parser
-            parser = Parser(tokens)
-            ast = parser.parse_program()
-            self.ast_area.delete("1.0", tk.END)
-            for line in ast:
-                self.ast_area.insert(tk.END, str(line) + "\n")
-
-            # Interpreter com captura da saída
-            self.output_area.delete("1.0", tk.END)
-            output_lines = []
-            interpreter = Interpreter(ast)
-
-            import builtins
-            old_print = builtins.print
-            old_input = builtins.input
-
-            # Captura print
-            builtins.print = lambda *args, **kwargs: output_lines.append(" ".join(map(str, args)))
-
-            # Captura input → abre caixinha no Tkinter
-            def gui_input(prompt=""):
-                self.output_area.insert(tk.END, prompt + "\n")
-                self.output_area.see(tk.END)
-                value = simpledialog.askstring("Entrada de Dados", prompt, parent=self.root)
-                if value is None:
-                    return ""  # usuário cancelou
-                value = value.strip()
-                # tenta converter para número
-                try:
-                    if "." in value:
-                        return float(value)
-                    return int(value)
-                except ValueError:
-                    return value  # mantém string se não for número
-
-            builtins.input = gui_input
-
-            interpreter.run()
-
-            # Restaura funções originais
-            builtins.print = old_print
-            builtins.input = old_input
-
-            # Mostra saída
-            for line in output_lines:
-                self.output_area.insert(tk.END, line + "\n")
+            # Lexer e Parser já rodaram de forma incremental
+            ast = self.frontend.program()
+            max_steps = int(self.max_steps.get() or 0) or sys.maxsize
 
+            output = BufferedOutput(QueueStream(self.messages), flush=FLUSH_LINE)
+            self.interpreter = BACKENDS[self.backend.get()](
+                ast, output=output, input=QueueInput(self.messages))
+            self.hooks = self.install_hooks(self.interpreter, stepping)
         except Exception as e:
+            self.interpreter = None
             messagebox.showerror("Erro de Execução", str(e))
+            return
+
+        self.output_area.delete("1.0", tk.END)
+        self.run_button.config(state=tk.DISABLED)
+        self.stop_button.config(state=tk.NORMAL)
+        threading.Thread(target=self.execute, args=(self.interpreter, max_steps),
+                         daemon=True).start()
+        self.root.after(50, self.poll_messages)
+
+    def execute(self, interpreter, max_steps):
+        # Roda na thread de execução: nada de Tk aqui, só a fila
+        error = None
+        try:
+            interpreter.run(max_steps=max_steps)
+        except Exception as e:
+            error = e
+        self.messages.put(("done", error))
+
+    def stop_program(self):
+        if self.interpreter is not None:
+            self.interpreter.cancel()
+            self.resume.set()      # se estiver pausada, para na próxima linha
+
+    # ========================================================
+    # Depuração: os hooks pausam a thread de execução, que espera
+    # os botões Passo/Continuar; a linha atual fica destacada
+    # --------------------------------------------------------
+    def debug_program(self):
+        self.run_program(stepping=True)
+
+    def install_hooks(self, interpreter, stepping):
+        breakpoints = [int(num) for num in self.breakpoints.get().replace(",", " ").split()]
+        watch = [var for var in self.watch.get().upper().replace(",", " ").split()]
+        for var in watch:
+            if len(var) != 1 or not "A" <= var <= "Z":
+                raise Exception(f"Variável inválida para observar: {var}")
+        if not (stepping or breakpoints or watch):
+            return None
+        hooks = DebugHooks(interpreter)
+        hooks.on_pause = self.on_pause
+        for num in breakpoints:
+            hooks.add_breakpoint(num)
+        for var in watch:
+            hooks.add_watchpoint(var)
+        hooks.set_stepping(stepping)
+        self.editor_lines = {entry.ast[1]: entry.line_num
+                             for entry in self.frontend.entries if entry.ast is not None}
+        return hooks
+
+    def on_pause(self, line_num, reason):
+        # Roda na thread de execução: avisa a interface e espera
+        self.resume.clear()
+        self.messages.put(("pause", line_num, reason))
+        self.resume.wait()
+
+    def show_pause(self, line_num, reason):
+        self.highlight_line(line_num)
+        self.append_output(f"[{reason}, linha {line_num}] {self.interpreter.dump()}\n")
+        self.step_button.config(state=tk.NORMAL)
+        self.continue_button.config(state=tk.NORMAL)
+
+    def step_program(self):
+        self.resume_program(stepping=True)
+
+    def continue_program(self):
+        self.resume_program(stepping=False)
+
+    def resume_program(self, stepping):
+        if self.hooks is None:
+            return
+        self.hooks.set_stepping(stepping)
+        self.step_button.config(state=tk.DISABLED)
+        self.continue_button.config(state=tk.DISABLED)
+        self.highlight_line(None)
+        self.resume.set()
+
+    def highlight_line(self, line_num):
+        self.code_area.tag_remove("current_line", "1.0", tk.END)
+        editor_line = self.editor_lines.get(line_num)
+        if editor_line is not None:
+            self.code_area.tag_add("current_line", f"{editor_line}.0", f"{editor_line}.0 + 1 lines")
+            self.code_area.see(f"{editor_line}.0")
+
+    def poll_messages(self):
+        # Esvazia a fila em lotes e junta a saída em um único insert
+        chunks = []
+        try:
+            for _ in range(2000):
+                message = self.messages.get_nowait()
+                kind = message[0]
+                if kind == "output":
+                    chunks.append(message[1])
+                    continue
+
+                self.append_output("".join(chunks))
+                chunks = []
+                if kind == "input":
+                    _, var, reply = message
+                    prompt = f"Digite {var}: "
+                    self.append_output(prompt + "\n")
+                    reply.put(simpledialog.askstring("Entrada de Dados", prompt, parent=self.root))
+                elif kind == "pause":
+                    self.show_pause(message[1], message[2])
+                elif kind == "done":
+                    self.finish(message[1])
+                    return
+        except queue.Empty:
+            pass
+        self.append_output("".join(chunks))
+        self.root.after(50, self.poll_messages)
+
+    def append_output(self, text):
+        if text:
+            self.output_area.insert(tk.END, text)
+            self.output_area.see(tk.END)
+
+    def finish(self, error):
+        interpreter, self.interpreter = self.interpreter, None
+        self.hooks = None
+        self.highlight_line(None)
+        self.run_button.config(state=tk.NORMAL)
+        self.stop_button.config(state=tk.DISABLED)
+        self.step_button.config(state=tk.DISABLED)
+        self.continue_button.config(state=tk.DISABLED)
+        if isinstance(error, ExecutionStopped):
+            self.append_output(f"[{error}]\n")
+        elif error is not None:
+            messagebox.showerror("Erro de Execução", str(error))
+        if interpreter.targets:
+            self.append_output(f"[Variáveis: {interpreter.dump()}]\n")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,168 @@
+# hooks.py
+# -----------------------------
+# Hooks de depuração do TinyBasic
+# Callbacks chamados durante a execução do Interpreter de árvore:
+#   on_line(linha)                       antes de cada linha
+#   on_statement(stmt, linha)            antes de cada statement
+#   on_write(variavel, antigo, novo, linha)  LET/INC/INPUT
+#   on_call(destino, linha, profundidade)    depois de um GOSUB
+#   on_return(linha_retorno, profundidade)   depois de um RETURN
+# e pausas: breakpoints de linha, watchpoints (a variável mudou de
+# valor) e passo a passo (pausa antes de toda linha). Em uma pausa,
+# on_pause(linha, motivo) é chamado e a execução só continua
+# quando ele retorna (a GUI bloqueia a thread de execução ali).
+#
+# Como no profiler, as versões instrumentadas de execute_line e
+# execute_stmt só são instaladas na instância quando há algum hook
+# que precisa delas; sem hooks o Interpreter roda o código original
+# (custo zero). Os backends compilados (closure, vm, trace) não
+# passam por execute_line e não têm hooks.
+# -----------------------------
+
+from interpreter import Interpreter
+from resolver import VAR_NAMES, slot
+
+WRITES = ("LET", "INC", "INPUT")
+
+
+class DebugHooks:
+    def __init__(self, interpreter):
+        if type(interpreter).run is not Interpreter.run:
+            raise Exception("Hooks de depuração só funcionam com o backend tree")
+        self.interpreter = interpreter
+        self.line_hooks = []
+        self.statement_hooks = []
+        self.write_hooks = []
+        self.call_hooks = []
+        self.return_hooks = []
+        self.breakpoints = set()     # números de linha
+        self.watchpoints = set()     # nomes de variáveis
+        self.stepping = False        # pausa antes de toda linha
+        self.on_pause = None         # on_pause(linha, motivo)
+        self.line_num = None         # linha em execução
+        self.installed_line = False
+        self.installed_stmt = False
+
+    # ========================================================
+    # Registro (cada chamada reinstala só o que for preciso)
+    # --------------------------------------------------------
+    def on_line(self, callback):
+        self.line_hooks.append(callback)
+        self.refresh()
+
+    def on_statement(self, callback):
+        self.statement_hooks.append(callback)
+        self.refresh()
+
+    def on_write(self, callback):
+        self.write_hooks.append(callback)
+        self.refresh()
+
+    def on_call(self, callback):
+        self.call_hooks.append(callback)
+        self.refresh()
+
+    def on_return(self, callback):
+        self.return_hooks.append(callback)
+        self.refresh()
+
+    def add_breakpoint(self, line_num):
+        self.breakpoints.add(line_num)
+        self.refresh()
+
+    def remove_breakpoint(self, line_num):
+        self.breakpoints.discard(line_num)
+        self.refresh()
+
+    def add_watchpoint(self, var):
+        self.watchpoints.add(var)
+        self.refresh()
+
+    def remove_watchpoint(self, var):
+        self.watchpoints.discard(var)
+        self.refresh()
+
+    def set_stepping(self, stepping):
+        self.stepping = stepping
+        self.refresh()
+
+    def clear(self):
+        for hooks in (self.line_hooks, self.statement_hooks, self.write_hooks,
+                      self.call_hooks, self.return_hooks):
+            hooks.clear()
+        self.breakpoints.clear()
+        self.watchpoints.clear()
+        self.stepping = False
+        self.refresh()
+
+    # ========================================================
+    # Instala ou remove as versões instrumentadas
+    # --------------------------------------------------------
+    def refresh(self):
+        need_line = bool(self.line_hooks or self.breakpoints or self.stepping)
+        need_stmt = bool(self.statement_hooks or self.write_hooks or self.call_hooks or
+                         self.return_hooks or self.watchpoints)
+        interp = self.interpreter
+        # A linha em execução também serve aos hooks de statement
+        need_line = need_line or need_stmt
+        if need_line and not self.installed_line:
+            interp.execute_line = self.hooked_line(interp.execute_line)
+        elif not need_line and self.installed_line:
+            del interp.execute_line
+        if need_stmt and not self.installed_stmt:
+            interp.execute_stmt = self.hooked_stmt(interp.execute_stmt)
+        elif not need_stmt and self.installed_stmt:
+            del interp.execute_stmt
+        self.installed_line, self.installed_stmt = need_line, need_stmt
+
+    def pause(self, reason):
+        if self.on_pause is not None:
+            self.on_pause(self.line_num, reason)
+
+    def hooked_line(self, execute_line):
+        ast = self.interpreter.ast
+
+        def line(index):
+            line_num = self.line_num = ast[index][1]
+            for callback in self.line_hooks:
+                callback(line_num)
+            if line_num in self.breakpoints:
+                self.pause(f"breakpoint na linha {line_num}")
+            elif self.stepping:
+                self.pause("passo")
+            return execute_line(index)
+        return line
+
+    def hooked_stmt(self, execute_stmt):
+        interp = self.interpreter
+        slots = interp.slots
+
+        def stmt_hook(stmt, current_index):
+            line_num = self.line_num
+            for callback in self.statement_hooks:
+                callback(stmt, line_num)
+            t = stmt[0]
+            if t in WRITES:
+                old = slots[stmt[1]]
+                result = execute_stmt(stmt, current_index)
+                name, new = VAR_NAMES[stmt[1]], slots[stmt[1]]
+                for callback in self.write_hooks:
+                    callback(name, old, new, line_num)
+                if name in self.watchpoints and new != old:
+                    self.pause(f"{name} mudou: {old} -> {new}")
+                return result
+            result = execute_stmt(stmt, current_index)
+            if t == "GOSUB":
+                for callback in self.call_hooks:
+                    callback(stmt[1], line_num, len(interp.call_stack))
+            elif t == "RETURN":
+                for callback in self.return_hooks:
+                    callback(interp.ast[result][1] if result < len(interp.ast) else None,
+                             len(interp.call_stack))
+            return result
+        return stmt_hook
+
+    # Valores das variáveis observadas (para mostrar em uma pausa)
+    def watched(self):
+        slots = self.interpreter.slots
+        return {name: slots[slot(name)] for name in sorted(self.watchpoints)}
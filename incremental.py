@@ -0,0 +1,121 @@
+# incremental.py
+# -----------------------------
+# Front end incremental do TinyBasic (usado pelo editor da GUI)
+# Como cada linha do TinyBasic é independente, guarda tokens, AST
+# e erro de cada linha do editor. A cada atualização só as linhas
+# editadas passam de novo pelo lexer e pelo Parser; as demais são
+# reaproveitadas (apenas renumeradas se mudaram de posição).
+# Observação: aqui a coluna dos tokens é relativa ao início da
+# linha, para que editar uma linha não altere as seguintes.
+# -----------------------------
+
+from lexer import lexer_stream
+from parser import Parser
+from tokens import Token
+
+
+# ============================================================
+# Resultado da análise de uma linha do editor
+# --------------------------------------------------------
+class LineEntry:
+    __slots__ = ("text", "line_num", "tokens", "ast", "error", "rendered", "rendered_ast")
+
+    def __init__(self, text, line_num):
+        self.text = text            # texto da linha no editor
+        self.line_num = line_num    # número da linha no editor (1, 2, ...)
+        self.tokens = []            # tokens da linha (inclui NEWLINE)
+        self.ast = None             # ("LINE", numero, [statements]) ou None
+        self.error = None           # mensagem de erro léxico/sintático
+        self.rendered = None        # texto dos tokens para o painel (sob demanda)
+        self.rendered_ast = None    # texto da AST para o painel
+        self.analyze()
+
+    def analyze(self):
+        self.rendered = None        # tokens mudaram (ou ao menos a linha deles)
+        self.rendered_ast = None
+        try:
+            self.tokens = [t for t in lexer_stream([self.text + "\n"], line_num=self.line_num)
+                           if t.type != "EOF"]
+            lines = Parser(self.tokens).parse_program()
+            self.ast = lines[0] if lines else None
+        except Exception as e:
+            self.error = str(e)
+        if self.ast is not None:
+            self.rendered_ast = str(self.ast)
+
+    def renumber(self, line_num):
+        self.line_num = line_num
+        if self.error:
+            # A mensagem de erro cita a linha: analisa de novo
+            self.tokens, self.ast, self.error = [], None, None
+            self.analyze()
+            return
+        for t in self.tokens:
+            t.line = line_num
+        self.rendered = None
+
+    def render(self):
+        if self.rendered is None:
+            self.rendered = [str(t) for t in self.tokens]
+        return self.rendered
+
+
+class IncrementalFrontEnd:
+    def __init__(self):
+        self.entries = []       # um LineEntry por linha do editor
+        self.reparsed = 0       # linhas analisadas na última atualização
+
+    # ========================================================
+    # Atualiza o estado para o novo texto do editor.
+    # Linhas iguais no início e no fim são reaproveitadas; só o
+    # trecho do meio é analisado de novo.
+    # --------------------------------------------------------
+    def update(self, source):
+        texts = source.split("\n")
+        while texts and not texts[-1].strip():
+            texts.pop()          # linhas vazias no fim são ignoradas
+
+        old = self.entries
+        prefix = 0
+        limit = min(len(old), len(texts))
+        while prefix < limit and old[prefix].text == texts[prefix]:
+            prefix += 1
+        suffix = 0
+        while (suffix < limit - prefix and
+               old[len(old) - 1 - suffix].text == texts[len(texts) - 1 - suffix]):
+            suffix += 1
+
+        middle = [LineEntry(text, prefix + i + 1)
+                  for i, text in enumerate(texts[prefix:len(texts) - suffix])]
+        tail = old[len(old) - suffix:] if suffix else []
+        self.entries = old[:prefix] + middle + tail
+        self.reparsed = len(middle)
+
+        # Linhas reaproveitadas que mudaram de posição são renumeradas
+        for line_num in range(len(self.entries) - suffix + 1, len(self.entries) + 1):
+            entry = self.entries[line_num - 1]
+            if entry.line_num != line_num:
+                entry.renumber(line_num)
+
+    # ========================================================
+    # Consultas usadas pela GUI
+    # --------------------------------------------------------
+    def errors(self):
+        return [entry.error for entry in self.entries if entry.error]
+
+    def program(self):
+        # AST completa, na mesma forma de Parser.parse_program()
+        errors = self.errors()
+        if errors:
+            raise Exception(errors[0])
+        return [entry.ast for entry in self.entries if entry.ast is not None]
+
+    def token_lines(self):
+        out = []
+        for entry in self.entries:
+            out.extend(entry.render())
+        out.append(str(Token("EOF", "$", len(self.entries) + 1, 0)))
+        return out
+
+    def ast_lines(self):
+        return [entry.rendered_ast for entry in self.entries if entry.ast is not None]
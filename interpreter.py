@@ -2,15 +2,92 @@
 # -----------------------------
 # Interpreter do TinyBasic
 # Executa a AST linha a linha
+# As variáveis A-Z ficam em uma lista de 26 slots; cada linha tem
+# os nomes trocados pelos índices (resolver.py) na primeira vez
+# que é executada
+# Os arrays (DIM) ficam à parte, em um ArrayStore (arrays.py)
+# Recebendo um SortedProgram (analysis.py) em vez da lista de
+# linhas, usa o line_map dele e os destinos dos saltos já
+# calculados, que vão no fim dos statements resolvidos:
+#   ("GOTO", 100) -> ("GOTO", 100, índice)
 # -----------------------------
 
+from arrays import ArrayStore
+from resolver import VAR_NAMES, assigned_names, resolve_line, slot
+from streams import BufferedOutput, ConsoleInput
+
+
+# Execução interrompida antes do fim: limite de passos ou cancelamento
+class ExecutionStopped(Exception):
+    pass
+
+
+# Lançada pelo objeto de entrada quando ainda não há valor para o
+# INPUT. step() a captura e a execução pode ser retomada depois,
+# a partir do próprio INPUT.
+class InputPending(Exception):
+    def __init__(self, var):
+        super().__init__(f"Aguardando valor para {var}")
+        self.var = var
+
+
+# Estados devolvidos por step()
+STEP_RUNNING = "running"   # fatia de passos esgotada, ainda não terminou
+STEP_INPUT = "input"       # parado em um INPUT sem valor disponível
+STEP_DONE = "done"         # programa terminou
+
+
 class Interpreter:
-    def __init__(self, ast):
+    def __init__(self, ast, output=None, input=None):
+        program = None
+        if not isinstance(ast, list):
+            program, ast = ast, ast.lines     # SortedProgram
         self.ast = ast                # lista de linhas: ("LINE", numero, [statements])
-        self.variables = {}           # dicionário para armazenar variáveis
+        self.program = [None] * len(ast)     # linhas resolvidas (variáveis como slots)
+        self.slots = [0] * len(VAR_NAMES)    # valores de A-Z (não inicializadas valem 0)
+        self.arrays = ArrayStore()           # arrays A()-Z() criados por DIM
+        self.targets = assigned_names(ast)   # variáveis que o programa escreve
         self.line_map = {}            # mapeia número da linha para índice da lista
         self.call_stack = []          # pilha para GOSUB/RETURN
-        self.build_line_map()         # constrói mapa de linhas
+        # Saída (write_line/flush) e entrada (read) do programa
+        self.output = output if output is not None else BufferedOutput()
+        self.input = input if input is not None else ConsoleInput()
+        self.stop_requested = False   # pedido de parada (cancel), vindo de outra thread
+        self.steps = 0                # passos executados por run(max_steps) ou step()
+        self.pc = 0                   # próxima linha para step()
+        self.stmt_index = 0           # próximo statement dessa linha
+        self.waiting_for = None       # variável do INPUT pendente (step)
+        self.successors = None        # destinos dos saltos por statement (SortedProgram)
+        if program is not None:
+            self.line_map = program.line_map
+            self.successors = program.successors
+        else:
+            self.build_line_map()     # constrói mapa de linhas
+
+    # ========================================================
+    # Visão nome -> valor das variáveis (debug, GUI)
+    # --------------------------------------------------------
+    # `variables` mostra as variáveis que o programa escreve;
+    # snapshot(all_slots=True) inclui as 26.
+    # --------------------------------------------------------
+    @property
+    def variables(self):
+        return self.snapshot()
+
+    @variables.setter
+    def variables(self, values):
+        self.restore(values)
+
+    def snapshot(self, all_slots=False):
+        names = VAR_NAMES if all_slots else self.targets
+        return {name: self.slots[slot(name)] for name in names}
+
+    def restore(self, values):
+        for name, value in values.items():
+            self.slots[slot(name)] = value
+
+    def dump(self):
+        return " ".join(f"{name}={value}" for name, value in self.snapshot().items())
 
     # ========================================================
     # Constrói mapa de linhas para facilitar GOTO e GOSUB
@@ -23,20 +100,91 @@ class Interpreter:
     # ========================================================
     # Executa o programa completo
     # --------------------------------------------------------
-    def run(self):
+    # Com max_steps, para com ExecutionStopped ao passar do limite
+    # de linhas executadas ou quando cancel() for chamado.
+    # --------------------------------------------------------
+    def run(self, max_steps=None):
+        try:
+            if max_steps is not None:
+                self.run_limited(max_steps)
+                return
+            i = 0
+            while i < len(self.ast):
+                #i = self.execute_line(i)  # retorna próximo índice da linha
+                next_i = self.execute_line(i)
+                if next_i == -1:  # encontrou END
+                    break
+                i = next_i
+        finally:
+            self.output.flush()   # garante a saída mesmo em caso de erro
+
+    def run_limited(self, max_steps):
         i = 0
         while i < len(self.ast):
-            #i = self.execute_line(i)  # retorna próximo índice da linha
+            self.check_stop(max_steps)
+            self.steps += 1
             next_i = self.execute_line(i)
-            if next_i == -1:  # encontrou END
+            if next_i == -1:
                 break
             i = next_i
 
+    # ========================================================
+    # Execução retomável
+    # --------------------------------------------------------
+    # step(n) executa até n linhas a partir de onde parou e devolve
+    # STEP_RUNNING, STEP_INPUT ou STEP_DONE. Se a entrada lançar
+    # InputPending, a execução para antes do INPUT e volta nele na
+    # próxima chamada (sem repetir os statements anteriores da linha).
+    # --------------------------------------------------------
+    def step(self, count):
+        n = len(self.ast)
+        self.waiting_for = None
+        try:
+            for _ in range(count):
+                index = self.pc
+                if not 0 <= index < n:
+                    return STEP_DONE
+                if self.stop_requested:
+                    raise ExecutionStopped("Execução interrompida")
+                if self.stmt_index == 0:
+                    self.steps += 1
+                self.pc = self.resume_line(index, self.stmt_index)
+                self.stmt_index = 0
+        except InputPending as e:
+            self.waiting_for = e.var
+            return STEP_INPUT
+        finally:
+            self.output.flush()
+        return STEP_DONE if not 0 <= self.pc < n else STEP_RUNNING
+
+    def resume_line(self, index, start):
+        stmt_list = self.resolved_line(index)[2]
+        for pos in range(start, len(stmt_list)):
+            self.stmt_index = pos
+            result = self.execute_stmt(stmt_list[pos], index)
+            if isinstance(result, int):
+                return result
+        return index + 1
+
+    # ========================================================
+    # Cancelamento e limite de passos
+    # --------------------------------------------------------
+    def cancel(self):
+        self.stop_requested = True
+
+    def check_stop(self, max_steps):
+        if self.stop_requested:
+            raise ExecutionStopped("Execução interrompida")
+        if self.steps >= max_steps:
+            raise ExecutionStopped(f"Limite de {max_steps} passos excedido")
+
     # ========================================================
     # Executa uma linha inteira
     # --------------------------------------------------------
     def execute_line(self, index):
-        line = self.ast[index]
+        line = self.program[index]
+        if line is None:
+            line = self.resolved_line(index)
         _, line_num, stmt_list = line
 
         for stmt in stmt_list:
@@ -47,6 +195,17 @@ class Interpreter:
 
         return index + 1  # próxima linha sequencial
 
+    def resolved_line(self, index):
+        line = self.program[index]
+        if line is None:
+            line = resolve_line(self.ast[index])
+            if self.successors is not None:
+                _, line_num, stmts = line
+                line = ("LINE", line_num, [stmt + targets for stmt, targets
+                                           in zip(stmts, self.successors[index])])
+            self.program[index] = line
+        return line
+
     # ========================================================
     # Executa um statement individual
     # --------------------------------------------------------
@@ -55,24 +214,46 @@ class Interpreter:
 
         if t == "LET":
             _, var, expr = stmt
-            self.variables[var] = self.eval_expr(expr)
+            self.slots[var] = self.eval_expr(expr)
+
+        elif t == "INC":
+            # Superinstrução do peephole: LET V = V + constante
+            _, var, amount = stmt
+            self.slots[var] += amount
 
         elif t == "PRINT":
             _, items = stmt
-            output = []
+            parts = []
             for item in items:
                 if item[0] == "STR":
-                    output.append(item[1])
+                    parts.append(item[1])
                 else:
-                    output.append(str(self.eval_expr(item)))
-            print(" ".join(output))
+                    parts.append(str(self.eval_expr(item)))
+            self.output.write_line(" ".join(parts))
 
         elif t == "INPUT":
             _, var = stmt
-            value = input(f"Digite {var}: ")
-            self.variables[var] = int(value)
+            self.slots[var] = self.input.read(VAR_NAMES[var], self.output)
+
+        elif t == "DIM":
+            _, var, size = stmt
+            self.arrays.dim(var, self.eval_expr(size))
+
+        elif t == "LET_INDEX":
+            _, var, index, expr = stmt
+            index = self.eval_expr(index)
+            self.arrays.put(var, index, self.eval_expr(expr))
+
+        elif t == "INPUT_INDEX":
+            _, var, index = stmt
+            index = self.eval_expr(index)
+            self.arrays.check_index(var, index)
+            self.arrays.put(var, index, self.input.read(f"{VAR_NAMES[var]}({index})", self.output))
 
         elif t == "IF":
+            if len(stmt) == 4:
+                # Destino já resolvido (SortedProgram)
+                return stmt[3] if self.eval_cond(stmt[1]) else None
             _, cond, line_num = stmt
             if self.eval_cond(cond):
                 if line_num in self.line_map:
@@ -80,7 +261,22 @@ class Interpreter:
                 else:
                     raise Exception(f"Linha {line_num} não encontrada para IF")
 
+        elif t == "IFELSE":
+            # Superinstrução do peephole: IF ... THEN seguido de GOTO
+            if len(stmt) == 6:
+                return stmt[4] if self.eval_cond(stmt[1]) else stmt[5]
+            _, cond, then_line, else_line = stmt
+            if self.eval_cond(cond):
+                line_num, kind = then_line, "IF"
+            else:
+                line_num, kind = else_line, "GOTO"
+            if line_num in self.line_map:
+                return self.line_map[line_num]
+            raise Exception(f"Linha {line_num} não encontrada para {kind}")
+
         elif t == "GOTO":
+            if len(stmt) == 3:
+                return stmt[2]
             _, line_num = stmt
             if line_num in self.line_map:
                 return self.line_map[line_num]
@@ -88,8 +284,10 @@ class Interpreter:
                 raise Exception(f"Linha {line_num} não encontrada para GOTO")
 
         elif t == "GOSUB":
-            _, line_num = stmt
             self.call_stack.append(current_index + 1)  # salva retorno
+            if len(stmt) == 3:
+                return stmt[2]
+            _, line_num = stmt
             if line_num in self.line_map:
                 return self.line_map[line_num]
             else:
@@ -102,7 +300,7 @@ class Interpreter:
                 raise Exception("RETURN sem GOSUB correspondente")
 
         elif t == "END":
-            print("Fim do programa.")
+            self.output.write_line("Fim do programa.")
             return -1 #antes exit(0)
 
         elif t == "REM":
@@ -119,9 +317,10 @@ class Interpreter:
     def eval_expr(self, expr):
         if expr[0] == "NUMBER":
             return expr[1]
-        elif expr[0] == "ID":
-            var = expr[1]
-            return self.variables.get(var, 0)  # variáveis não inicializadas valem 0
+        elif expr[0] == "VAR":
+            return self.slots[expr[1]]   # índice do slot (ver resolver.py)
+        elif expr[0] == "INDEX":
+            return self.arrays.get(expr[1], self.eval_expr(expr[2]))
         elif expr[0] == "BINOP":
             _, op, left, right = expr
             left_val = self.eval_expr(left)
@@ -0,0 +1,354 @@
+# lanes.py
+# -----------------------------
+# Execução em lanes do TinyBasic (requer NumPy)
+# Roda N instâncias do mesmo programa de uma vez, cada uma com a
+# sua sequência de valores de INPUT (varreduras de parâmetros,
+# correção de exercícios). As variáveis A-Z viram arrays NumPy
+# de tamanho N e as expressões são avaliadas com operações
+# vetoriais.
+#
+# Cada lane tem o seu contador de programa (pc). A cada passo é
+# executada a linha de menor pc entre as lanes ativas, só para
+# as lanes que estão nela (máscara). Quando um IF diverge, as
+# lanes seguem caminhos diferentes e voltam a andar juntas
+# quando chegam à mesma linha.
+#
+# O resultado de cada lane é o mesmo de um Interpreter.run com
+# ListInput, com uma diferença: os valores são inteiros de 64 bits.
+# Uma conta ou um INPUT que não cabe em 64 bits para a lane com
+# erro (como a divisão por zero), em vez de dar a volta em silêncio.
+# Programas com arrays (DIM) não são suportados.
+# -----------------------------
+
+import argparse
+
+import numpy as np
+
+from arrays import uses_arrays
+from resolver import VAR_NAMES, assigned_names, slot
+
+# pc das lanes que terminaram (END, fim do programa ou erro)
+DONE = np.iinfo(np.int64).max
+INT_MIN = np.iinfo(np.int64).min
+INT_MAX = np.iinfo(np.int64).max
+OVERFLOW = "Valor não cabe em um inteiro de 64 bits"
+
+# Seleção de todas as lanes: fatia sem cópia em vez de índice
+ALL = slice(None)
+
+
+# Erro em parte das lanes avaliadas: `positions` são as posições
+# (dentro do índice de lanes avaliado) que falharam
+class LaneError(Exception):
+    def __init__(self, positions, message):
+        super().__init__(message)
+        self.positions = positions
+
+
+class LaneInterpreter:
+    def __init__(self, ast, inputs, max_steps=None):
+        if uses_arrays(ast):
+            raise Exception("Execução em lanes não suporta arrays (DIM)")
+        self.ast = ast
+        self.lanes = len(inputs)
+        self.max_steps = max_steps
+        self.targets = assigned_names(ast)   # variáveis que o programa escreve
+        self.line_map = {}
+        for i, (_, line_num, _) in enumerate(ast):
+            self.line_map[line_num] = i
+
+        n = self.lanes
+        self.values = np.zeros((len(VAR_NAMES), n), dtype=np.int64)  # variáveis A-Z
+        self.pc = np.zeros(n, dtype=np.int64)                # linha atual de cada lane
+        self.steps = np.zeros(n, dtype=np.int64)             # linhas executadas por lane
+        self.stack = np.zeros((n, 16), dtype=np.int64)       # pilhas de GOSUB
+        self.sp = np.zeros(n, dtype=np.int64)                # topo de cada pilha
+        self.outputs = [[] for _ in range(n)]                # linhas impressas por lane
+        self.errors = [None] * n                             # erro de cada lane (ou None)
+
+        # Entradas: matriz N x maior sequência, com o tamanho de cada uma
+        self.input_len = np.fromiter(map(len, inputs), dtype=np.int64, count=n)
+        self.input_pos = np.zeros(n, dtype=np.int64)
+        width = int(self.input_len.max()) if n else 0
+        self.inputs = np.zeros((n, max(width, 1)), dtype=np.int64)
+        # Valores fora dos 64 bits entram como 0 e marcados: o erro
+        # só acontece na lane que chegar a ler o valor
+        flat = [int(v) for values in inputs for v in values]
+        too_big = np.array([not INT_MIN <= v <= INT_MAX for v in flat], dtype=bool)
+        flat = np.array([0 if bad else v for v, bad in zip(flat, too_big.tolist())],
+                        dtype=np.int64)
+        starts = np.repeat(np.cumsum(self.input_len) - self.input_len, self.input_len)
+        cells = (np.repeat(np.arange(n), self.input_len), np.arange(len(flat)) - starts)
+        self.inputs[cells] = flat
+        self.input_overflow = np.zeros(self.inputs.shape, dtype=bool)
+        self.input_overflow[cells] = too_big
+        self.all_lanes = np.arange(n)
+
+        if not ast:
+            self.pc[:] = DONE
+
+    # ========================================================
+    # Executa todas as lanes até terminarem
+    # --------------------------------------------------------
+    def run(self):
+        pc = self.pc
+        while self.lanes:
+            index = int(pc.min())
+            if index == DONE:
+                break
+            if index >= len(self.ast):
+                pc[pc == index] = DONE   # passou da última linha: fim
+                continue
+            at = pc == index
+            lanes = self.all_lanes if at.all() else np.flatnonzero(at)
+            if self.max_steps is not None:
+                over = self.steps[lanes] >= self.max_steps
+                if over.any():
+                    self.fail(lanes[over], f"Limite de {self.max_steps} passos excedido")
+                    lanes = lanes[~over]
+                    if not len(lanes):
+                        continue
+            self.steps[self.select(lanes)] += 1
+            self.execute_line(index, lanes)
+        return self
+
+    def select(self, lanes):
+        # Com todas as lanes juntas na mesma linha, os arrays são
+        # lidos e escritos por fatias (views), sem indexação avançada
+        return ALL if len(lanes) == self.lanes else lanes
+
+    def fail(self, lanes, message):
+        for lane in lanes.tolist():
+            self.errors[lane] = message
+        self.pc[lanes] = DONE
+
+    # ========================================================
+    # Executa uma linha para as lanes indicadas
+    # Lanes que saltam saem de `lanes`; as que sobram seguem para
+    # o próximo statement e, no fim, para a próxima linha.
+    # --------------------------------------------------------
+    def execute_line(self, index, lanes):
+        for stmt in self.ast[index][2]:
+            while True:
+                try:
+                    lanes = self.execute_stmt(stmt, index, lanes)
+                    break
+                except LaneError as e:
+                    # Só as lanes com erro param; o statement é repetido
+                    # para as demais (a avaliação não tem efeitos colaterais)
+                    failed = np.zeros(len(lanes), dtype=bool)
+                    failed[e.positions] = True
+                    self.fail(lanes[failed], str(e))
+                    lanes = lanes[~failed]
+                    if not len(lanes):
+                        return
+            if not len(lanes):
+                return
+        self.pc[self.select(lanes)] = index + 1
+
+    def execute_stmt(self, stmt, index, lanes):
+        t = stmt[0]
+        sel = self.select(lanes)
+
+        if t == "LET":
+            _, var, expr = stmt
+            self.values[slot(var), sel] = self.eval_expr(expr, sel, len(lanes))
+
+        elif t == "PRINT":
+            columns = []
+            for item in stmt[1]:
+                if item[0] == "STR":
+                    columns.append([item[1]] * len(lanes))
+                else:
+                    value = np.broadcast_to(self.eval_expr(item, sel, len(lanes)), lanes.shape)
+                    columns.append([str(v) for v in value.tolist()])
+            outputs = self.outputs
+            for lane, parts in zip(lanes.tolist(), zip(*columns) if columns else
+                                   [()] * len(lanes)):
+                outputs[lane].append(" ".join(parts))
+
+        elif t == "INPUT":
+            _, var = stmt
+            pos = self.input_pos[lanes]
+            empty = pos >= self.input_len[lanes]
+            if empty.any():
+                raise LaneError(np.flatnonzero(empty), f"Entrada esgotada ao ler {var}")
+            overflow = self.input_overflow[lanes, pos]
+            if overflow.any():
+                raise LaneError(np.flatnonzero(overflow),
+                                f"Valor de {var} não cabe em um inteiro de 64 bits")
+            self.values[slot(var), lanes] = self.inputs[lanes, pos]
+            self.input_pos[lanes] = pos + 1
+
+        elif t == "IF":
+            _, cond, line_num = stmt
+            taken = self.eval_cond(cond, sel, len(lanes))
+            if taken.any():
+                if line_num not in self.line_map:
+                    raise LaneError(np.flatnonzero(taken),
+                                    f"Linha {line_num} não encontrada para IF")
+                if sel is ALL:
+                    self.pc[taken] = self.line_map[line_num]
+                else:
+                    self.pc[lanes[taken]] = self.line_map[line_num]
+                return lanes[~taken]
+
+        elif t == "GOTO":
+            _, line_num = stmt
+            if line_num not in self.line_map:
+                raise LaneError(np.arange(len(lanes)),
+                                f"Linha {line_num} não encontrada para GOTO")
+            self.pc[sel] = self.line_map[line_num]
+            return lanes[:0]
+
+        elif t == "GOSUB":
+            _, line_num = stmt
+            if line_num not in self.line_map:
+                raise LaneError(np.arange(len(lanes)),
+                                f"Linha {line_num} não encontrada para GOSUB")
+            sp = self.sp[lanes]
+            if sp.max() >= self.stack.shape[1]:
+                self.stack = np.concatenate([self.stack, np.zeros_like(self.stack)], axis=1)
+            self.stack[lanes, sp] = index + 1   # retorno: próxima linha
+            self.sp[lanes] = sp + 1
+            self.pc[lanes] = self.line_map[line_num]
+            return lanes[:0]
+
+        elif t == "RETURN":
+            sp = self.sp[lanes]
+            empty = sp == 0
+            if empty.any():
+                raise LaneError(np.flatnonzero(empty), "RETURN sem GOSUB correspondente")
+            self.pc[lanes] = self.stack[lanes, sp - 1]
+            self.sp[lanes] = sp - 1
+            return lanes[:0]
+
+        elif t == "END":
+            for lane in lanes.tolist():
+                self.outputs[lane].append("Fim do programa.")
+            self.pc[lanes] = DONE
+            return lanes[:0]
+
+        elif t == "REM":
+            pass
+
+        else:
+            raise Exception(f"Statement inesperado: {stmt}")
+
+        return lanes
+
+    # ========================================================
+    # Avaliação vetorial: devolve um array com `count` valores,
+    # um por lane da seleção `sel` (ou um escalar, para constantes)
+    # --------------------------------------------------------
+    def eval_expr(self, expr, sel, count):
+        kind = expr[0]
+        if kind == "NUMBER":
+            if not INT_MIN <= expr[1] <= INT_MAX:
+                raise LaneError(np.arange(count), OVERFLOW)
+            return np.int64(expr[1])
+        elif kind == "ID":
+            return self.values[slot(expr[1]), sel]
+        elif kind == "BINOP":
+            _, op, left, right = expr
+            left_val = self.eval_expr(left, sel, count)
+            right_val = self.eval_expr(right, sel, count)
+            # As contas dão a volta em 64 bits; o estouro é detectado
+            # depois, pelo resultado, e só as lanes afetadas param
+            with np.errstate(over="ignore"):
+                if op == "PLUS":
+                    result = left_val + right_val
+                    overflow = ((left_val ^ result) & (right_val ^ result)) < 0
+                elif op == "MINUS":
+                    result = left_val - right_val
+                    overflow = ((left_val ^ right_val) & (left_val ^ result)) < 0
+                elif op == "MUL":
+                    result = left_val * right_val
+                    nonzero = np.where(left_val == 0, 1, left_val)
+                    overflow = ((left_val != 0) & (result // nonzero != right_val)) | \
+                        ((left_val == -1) & (right_val == INT_MIN))
+                elif op == "DIV":
+                    zero = np.broadcast_to(right_val == 0, (count,))
+                    if zero.any():
+                        raise LaneError(np.flatnonzero(zero), "Divisão por zero")
+                    result = left_val // right_val    # divisão inteira com piso, como no Python
+                    overflow = (left_val == INT_MIN) & (right_val == -1)
+                else:
+                    raise Exception(f"Expr inesperada: {expr}")
+            overflow = np.broadcast_to(overflow, (count,))
+            if overflow.any():
+                raise LaneError(np.flatnonzero(overflow), OVERFLOW)
+            return result
+        raise Exception(f"Expr inesperada: {expr}")
+
+    def eval_cond(self, cond, sel, count):
+        _, left, op, right = cond
+        left_val = self.eval_expr(left, sel, count)
+        right_val = self.eval_expr(right, sel, count)
+        if op == "EQ":
+            result = left_val == right_val
+        elif op == "NE":
+            result = left_val != right_val
+        elif op == "LT":
+            result = left_val < right_val
+        elif op == "GT":
+            result = left_val > right_val
+        elif op == "LE":
+            result = left_val <= right_val
+        elif op == "GE":
+            result = left_val >= right_val
+        else:
+            raise Exception(f"Operador relacional inesperado: {op}")
+        return np.broadcast_to(result, (count,))
+
+    # ========================================================
+    # Resultados por lane
+    # --------------------------------------------------------
+    def output_text(self, lane):
+        lines = self.outputs[lane]
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def variables(self, lane):
+        # Mesmo formato de Interpreter.variables
+        return {name: int(self.values[slot(name), lane]) for name in self.targets}
+
+
+def run_lanes(ast, inputs, max_steps=None):
+    return LaneInterpreter(ast, inputs, max_steps).run()
+
+
+# ============================================================
+# Linha de comando: um programa, um arquivo com uma lane por linha
+# (valores de INPUT separados por espaço ou vírgula)
+# ============================================================
+if __name__ == "__main__":
+    import time
+
+    from lexer import lexer
+    from parser import Parser
+
+    arg_parser = argparse.ArgumentParser(description="Executa um programa TinyBasic em N lanes")
+    arg_parser.add_argument("program", help="arquivo do programa")
+    arg_parser.add_argument("inputs", help="arquivo de entradas: uma lane por linha")
+    arg_parser.add_argument("--max-steps", type=int, help="limite de passos por lane")
+    arg_parser.add_argument("--quiet", "-q", action="store_true",
+                            help="mostra só o resumo, sem a saída de cada lane")
+    args = arg_parser.parse_args()
+
+    with open(args.program, "r", encoding="utf-8") as f:
+        ast = Parser(lexer(f.read())).parse_program()
+    with open(args.inputs, "r", encoding="utf-8") as f:
+        inputs = [line.replace(",", " ").split() for line in f if line.strip()]
+
+    start = time.perf_counter()
+    result = run_lanes(ast, inputs, args.max_steps)
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        for lane in range(result.lanes):
+            for text in result.outputs[lane]:
+                print(f"[{lane}] {text}")
+            if result.errors[lane]:
+                print(f"[{lane}] Erro: {result.errors[lane]}")
+    failed = sum(1 for error in result.errors if error)
+    print(f"{result.lanes} lanes em {elapsed:.3f} s, {failed} com erro")
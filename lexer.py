@@ -5,7 +5,7 @@
 # -----------------------------
 
 import re
-from token import Token
+from tokens import Token, TokenBuffer
 
 # ============================================================
 # Definição dos padrões de tokens (expressões regulares).
@@ -23,6 +23,7 @@ token_specification = [
     ("GOSUB",    r'GOSUB'),      # palavra-chave GOSUB
     ("RETURN",   r'RETURN'),     # palavra-chave RETURN
     ("END",      r'END'),        # palavra-chave END
+    ("DIM",      r'DIM'),        # palavra-chave DIM (arrays)
     ("REM",      r'REM.*'),      # comentário até o fim da linha
     ("ID",       r'[A-Z]'),      # variáveis (letra maiúscula)
     ("STR",      r'"[^"\n]*"'),  # strings entre aspas
@@ -51,62 +52,16 @@ get_token = re.compile(tok_regex).match
 # ============================================================
 # Função principal: analisador léxico
 # Recebe código-fonte e devolve lista de tokens.
+# Com compact=True devolve um TokenBuffer (arrays paralelos)
+# em vez de uma lista de objetos Token.
 # ============================================================
-def lexer(code, debug=False):
-    pos = 0
-    line_num = 1
-    tokens = []
-    mo = get_token(code, pos)
-
-    while mo:
-        kind = mo.lastgroup       # tipo do token
-        value = mo.group(kind)    # valor capturado
-
-        # =======================
-        # Tratamento por categoria
-        # =======================
-        if kind == "NUMBER":
-            tokens.append(Token(kind, int(value), line_num, mo.start()))
-        
-        elif kind in {"ID", "LET", "PRINT", "INPUT", "IF", "THEN", 
-                      "GOTO", "GOSUB", "RETURN", "END"}:
-            tokens.append(Token(kind, value, line_num, mo.start()))
-        
-        elif kind == "REM":
-            tokens.append(Token("REM", value[3:].strip(), line_num, mo.start()))
-        
-        elif kind == "STR":
-            tokens.append(Token(kind, value[1:-1], line_num, mo.start()))
-        
-        elif kind in {"GE", "LE", "NE", "GT", "LT", "EQ",
-                      "PLUS", "MINUS", "MUL", "DIV",
-                      "LPAREN", "RPAREN", "COMMA", "COLON"}:
-            tokens.append(Token(kind, value, line_num, mo.start()))
-        
-        elif kind == "NEWLINE":
-            tokens.append(Token(kind, value, line_num, mo.start()))
-            line_num += 1
-        
-        elif kind == "SKIP":
-            pass  # ignora espaços/tabs
-        
-        elif kind == "MISMATCH":
-            # 🚨 Tratamento de erro detalhado
-            error_col = mo.start() - code.rfind("\n", 0, mo.start())
-            error_line = code.splitlines()[line_num - 1]
-            raise RuntimeError(
-                f"\nErro léxico na linha {line_num}, coluna {error_col}:\n"
-                f"  {error_line}\n"
-                f"  {' ' * (error_col-1)}^\n"
-                f"Caractere inesperado: {value!r}"
-            )
-
-        # Avança para o próximo token
-        pos = mo.end()
-        mo = get_token(code, pos)
-
-    # Adiciona token EOF no final
-    tokens.append(Token("EOF", "$", line_num, pos))
+def lexer(code, debug=False, compact=False):
+    if compact:
+        tokens = TokenBuffer()
+        for _ in lexer_stream([code], tokens.append):
+            pass
+    else:
+        tokens = list(lexer_stream([code]))
 
     # Se debug=True, imprime tokens
     if debug:
@@ -114,3 +69,74 @@ def lexer(code, debug=False):
             print(t)
 
     return tokens
+
+
+# ============================================================
+# Modo gerador: produz os tokens um a um a partir de um arquivo
+# aberto (ou qualquer iterável de linhas), sem guardar a lista
+# inteira nem o texto completo na memória.
+# `make_token` cria cada token (padrão: Token); o lexer compacto
+# passa TokenBuffer.append para gravar direto nos arrays.
+# `line_num` e `offset` indicam onde o primeiro trecho começa no
+# fonte, para analisar só um pedaço dele.
+# ============================================================
+def lexer_stream(lines, make_token=Token, line_num=1, offset=0):
+
+    for chunk in lines:
+        pos = 0
+        mo = get_token(chunk, pos)
+
+        while mo:
+            kind = mo.lastgroup       # tipo do token
+            value = mo.group(kind)    # valor capturado
+            column = offset + mo.start()
+
+            # =======================
+            # Tratamento por categoria
+            # =======================
+            if kind == "NUMBER":
+                yield make_token(kind, int(value), line_num, column)
+
+            elif kind in {"ID", "LET", "PRINT", "INPUT", "IF", "THEN",
+                          "GOTO", "GOSUB", "RETURN", "END", "DIM"}:
+                yield make_token(kind, value, line_num, column)
+
+            elif kind == "REM":
+                yield make_token("REM", value[3:].strip(), line_num, column)
+
+            elif kind == "STR":
+                yield make_token(kind, value[1:-1], line_num, column)
+
+            elif kind in {"GE", "LE", "NE", "GT", "LT", "EQ",
+                          "PLUS", "MINUS", "MUL", "DIV",
+                          "LPAREN", "RPAREN", "COMMA", "COLON"}:
+                yield make_token(kind, value, line_num, column)
+
+            elif kind == "NEWLINE":
+                yield make_token(kind, value, line_num, column)
+                line_num += 1
+
+            elif kind == "SKIP":
+                pass  # ignora espaços/tabs
+
+            elif kind == "MISMATCH":
+                # 🚨 Tratamento de erro detalhado
+                line_start = chunk.rfind("\n", 0, mo.start()) + 1
+                line_end = chunk.find("\n", mo.start())
+                error_col = mo.start() - line_start + 1
+                error_line = chunk[line_start:line_end if line_end != -1 else len(chunk)]
+                raise RuntimeError(
+                    f"\nErro léxico na linha {line_num}, coluna {error_col}:\n"
+                    f"  {error_line}\n"
+                    f"  {' ' * (error_col-1)}^\n"
+                    f"Caractere inesperado: {value!r}"
+                )
+
+            # Avança para o próximo token
+            pos = mo.end()
+            mo = get_token(chunk, pos)
+
+        offset += len(chunk)
+
+    # Adiciona token EOF no final
+    yield make_token("EOF", "$", line_num, offset)
@@ -2,44 +2,308 @@
 # -----------------------------
 # TinyBasic - Programa principal
 # Integra lexer, parser e interpreter
+# Uso: python main.py [arquivo] [opções]   ("-" lê a entrada padrão)
+# Por padrão só a saída do programa aparece; --dump-tokens,
+# --dump-ast e --verbose mostram as etapas. Cada módulo é
+# importado só no modo que o usa, para a partida ser rápida
+# (ver "benchmark.py startup").
 # -----------------------------
 
-from lexer import lexer
-from parser import Parser
-from interpreter import Interpreter
-from token import Token  # nosso Token.py, não o módulo interno do Python
+import argparse
+import sys
+
+from backends import BACKEND_NAMES, load_backend
+from streams import BufferedOutput, ConsoleInput, ListInput, FLUSH_POLICIES, INPUT_POLICIES
+
+# Abaixo deste tamanho, lexer e parser custam menos que importar o
+# cache (hashlib, marshal) e ler a AST do disco
+CACHE_MIN_SIZE = 16 * 1024
+
+arg_parser = argparse.ArgumentParser(description="Interpretador TinyBasic")
+arg_parser.add_argument("program", nargs="?", default="program.txt",
+                        help="arquivo do programa (padrão: program.txt; \"-\" lê a entrada padrão)")
+arg_parser.add_argument("--backend", choices=BACKEND_NAMES, default="tree",
+                        help="backend de execução (padrão: tree). No vm o GOSUB volta para o "
+                             "statement seguinte; nos outros, para a linha seguinte")
+arg_parser.add_argument("--dump-tokens", action="store_true",
+                        help="lista os tokens gerados pelo lexer")
+arg_parser.add_argument("--dump-ast", action="store_true",
+                        help="lista a AST gerada pelo parser")
+arg_parser.add_argument("--verbose", "-v", action="store_true",
+                        help="mostra o uso do cache e os relatórios do otimizador e do peephole")
+arg_parser.add_argument("--stream", action="store_true",
+                        help="lê, analisa e monta a AST em streaming, linha a linha")
+arg_parser.add_argument("--jobs", "-j", type=int,
+                        help="lexer e parser em N processos, por blocos de linhas")
+arg_parser.add_argument("--no-cache", action="store_true",
+                        help="não usa o cache de programas já analisados")
+arg_parser.add_argument("--check", action="store_true",
+                        help="analisa o programa antes de executar (destinos de salto, linhas "
+                             "inalcançáveis, RETURN sem GOSUB, variáveis sem valor) e para se houver erro")
+arg_parser.add_argument("--sort", action="store_true",
+                        help="executa as linhas em ordem numérica (a última linha repetida vale)")
+arg_parser.add_argument("--opt-level", type=int, choices=(0, 1, 2), default=0,
+                        help="nível de otimização da AST (padrão: 0)")
+arg_parser.add_argument("--no-peephole", action="store_true",
+                        help="desliga as superinstruções do peephole (INC, IFELSE, remoção de REM)")
+arg_parser.add_argument("--flush", choices=FLUSH_POLICIES,
+                        help="quando descarregar a saída: a cada linha, por tamanho "
+                             "ou só no fim (padrão: linha em terminal, tamanho no resto)")
+arg_parser.add_argument("--input", metavar="ARQUIVO",
+                        help="lê os valores dos INPUTs deste arquivo, de uma vez, em vez de "
+                             "perguntar no terminal (\"-\" lê a entrada padrão)")
+arg_parser.add_argument("--input-errors", choices=INPUT_POLICIES, default="error",
+                        help="valor inválido ou entrada esgotada: erro, usa 0 ou descarta "
+                             "e lê o próximo (padrão: error)")
+arg_parser.add_argument("--array", action="append", default=[], metavar="A=ARQUIVO",
+                        help="carrega o array A (inteiros separados por espaço ou linha) "
+                             "antes da execução; pode ser repetido")
+arg_parser.add_argument("--max-steps", type=int,
+                        help="interrompe a execução após este número de passos")
+arg_parser.add_argument("--checkpoint", metavar="ARQUIVO",
+                        help="grava o estado da execução neste arquivo a cada --checkpoint-every "
+                             "passos e ao receber SIGTERM (só backend tree)")
+arg_parser.add_argument("--checkpoint-every", type=int, metavar="N",
+                        help="passos entre checkpoints (padrão: 100000)")
+arg_parser.add_argument("--resume", action="store_true",
+                        help="continua a execução a partir do --checkpoint gravado")
+arg_parser.add_argument("--profile", action="store_true",
+                        help="mede execuções e tempo por linha (só backend tree)")
+arg_parser.add_argument("--profile-json", metavar="ARQUIVO",
+                        help="grava o perfil em JSON (implica --profile)")
+arg_parser.add_argument("--profile-collapsed", metavar="ARQUIVO",
+                        help="grava pilhas no formato collapsed para flamegraph (implica --profile)")
+arg_parser.add_argument("--disassemble", action="store_true",
+                        help="mostra o bytecode do programa e não executa")
+arg_parser.add_argument("--trace-stats", action="store_true",
+                        help="mostra os traces compilados e as voltas em cada um (backend trace)")
+args = arg_parser.parse_args()
+args.profile = args.profile or bool(args.profile_json or args.profile_collapsed)
+if args.profile and args.backend != "tree":
+    arg_parser.error("--profile só funciona com o backend tree")
+if (args.resume or args.checkpoint_every) and not args.checkpoint:
+    arg_parser.error("--resume e --checkpoint-every precisam de --checkpoint")
+if args.checkpoint and args.backend != "tree":
+    arg_parser.error("--checkpoint só funciona com o backend tree")
+if args.checkpoint and args.profile:
+    arg_parser.error("--checkpoint não funciona com --profile")
+if args.checkpoint and args.stream and args.program == "-":
+    arg_parser.error("--checkpoint não funciona com --stream lendo a entrada padrão")
+if args.trace_stats and args.backend != "trace":
+    arg_parser.error("--trace-stats só funciona com o backend trace")
+if args.dump_tokens and (args.stream or args.jobs):
+    arg_parser.error("--dump-tokens não funciona com --stream nem com --jobs")
+for spec in args.array:
+    name, _, path = spec.partition("=")
+    if len(name) != 1 or not "A" <= name.upper() <= "Z" or not path:
+        arg_parser.error(f"--array espera LETRA=ARQUIVO, recebido {spec!r}")
+if args.program == "-" and args.input == "-":
+    arg_parser.error("o programa e os INPUTs não podem vir os dois da entrada padrão")
+
+
+# Erro do programa (léxico, sintático ou de execução): mensagem
+# em stderr e código de saída 1, sem traceback
+def fail(message):
+    sys.stdout.flush()
+    print(message, file=sys.stderr)
+    raise SystemExit(1)
+
+
+def separator():
+    print("-" * 40)
+
 
 # -----------------------------
-# Lê o código TinyBasic de um arquivo
+# Carrega o fonte (mmap para arquivos grandes) e procura a AST
+# no cache: em um acerto, lexer e parser nem são importados
 # -----------------------------
-with open("program.txt", "r", encoding="utf-8") as f:
-    code = f.read()
+data = None
+if not args.stream:
+    from source import open_source, decode_source
+    try:
+        data = open_source(args.program)
+    except OSError as e:
+        fail(f"Não foi possível ler {args.program}: {e.strerror}")
+
+try:
+    cache = cache_key = None
+    use_cache = not args.no_cache and not (args.stream and args.program == "-")
+    if use_cache and data is not None and len(data) < CACHE_MIN_SIZE:
+        use_cache = False
+    if use_cache:
+        from cache import ProgramCache
+        cache = ProgramCache()
+        cache_key = cache.file_key(args.program) if args.stream else cache.data_key(data)
+    ast = cache.get(cache_key) if cache else None
+    ast_from_cache = ast is not None
+
+    if args.dump_tokens:
+        # -----------------------------
+        # Passo 1: Lexer (listagem dos tokens)
+        # -----------------------------
+        from lexer import lexer
+        tokens = lexer(decode_source(data))
+        print("Tokens gerados pelo Lexer:")
+        for t in tokens:
+            print(t)
+        separator()
 
+    if ast_from_cache:
+        if args.verbose:
+            print("AST carregada do cache (lexer e parser não executados)")
+            separator()
+    elif args.stream:
+        # -----------------------------
+        # Passos 1 e 2 em streaming: o Parser puxa os tokens do
+        # lexer conforme lê o arquivo, linha a linha
+        # -----------------------------
+        from lexer import lexer_stream
+        from parser import Parser
+        if args.program == "-":
+            ast = Parser(lexer_stream(sys.stdin)).parse_program()
+        else:
+            with open(args.program, "r", encoding="utf-8") as f:
+                ast = Parser(lexer_stream(f)).parse_program()
+    elif args.jobs:
+        # -----------------------------
+        # Passos 1 e 2 em paralelo: blocos de linhas analisados
+        # em um pool de processos (mesma AST do caminho serial)
+        # -----------------------------
+        from parallel_frontend import parse_parallel
+        ast = parse_parallel(decode_source(data), args.jobs)
+    else:
+        # -----------------------------
+        # Passos 1 e 2: Lexer e Parser
+        # -----------------------------
+        from parser import Parser
+        if not args.dump_tokens:
+            from lexer import lexer
+            tokens = lexer(decode_source(data))
+        ast = Parser(tokens).parse_program()
+except FileNotFoundError as e:
+    fail(f"Não foi possível ler {args.program}: {e.strerror}")
+except Exception as e:
+    fail(str(e).strip())
+
+if cache and not ast_from_cache:
+    cache.put(cache_key, ast)
+
+if args.dump_ast:
+    print("AST gerada pelo Parser:")
+    for line in ast:
+        print(line)
+    separator()
 
 # -----------------------------
-# Passo 1: Lexer
-# Transforma o código em uma lista de tokens
+# Passos opcionais: ordenação e análise estática
 # -----------------------------
-tokens = lexer(code)
-print("Tokens gerados pelo Lexer:")
-for t in tokens:
-    print(t)
-print("-" * 40)
+if args.sort:
+    from analysis import sort_program
+    ast = sort_program(ast).lines
+
+if args.check:
+    from analysis import analyze
+    analysis = analyze(ast)
+    if analysis.findings:
+        print(analysis.report(), file=sys.stderr)
+    elif args.verbose:
+        print(analysis.report())
+        separator()
+    if analysis.errors:
+        raise SystemExit(1)
 
 # -----------------------------
-# Passo 2: Parser
-# Constrói a AST a partir da lista de tokens
+# Passo opcional: otimização da AST
 # -----------------------------
-parser = Parser(tokens)
-ast = parser.parse_program()
-print("AST gerada pelo Parser:")
-for line in ast:
-    print(line)
-print("-" * 40)
+if args.opt_level > 0:
+    from optimizer import optimize
+    ast, report = optimize(ast, args.opt_level)
+    if args.verbose:
+        print(report)
+        separator()
+
+# -----------------------------
+# Passo opcional: superinstruções (peephole)
+# -----------------------------
+if not args.no_peephole:
+    from peephole import peephole
+    ast, report = peephole(ast)
+    if args.verbose:
+        print(report)
+        separator()
+
+# Listagem do bytecode para debug
+if args.disassemble:
+    from bytecode import compile_program, disassemble
+    try:
+        print(disassemble(compile_program(ast)))
+    except Exception as e:
+        fail(f"Erro: {e}")
+    raise SystemExit(0)
 
 # -----------------------------
 # Passo 3: Interpreter
 # Executa a AST linha a linha
 # -----------------------------
-interpreter = Interpreter(ast)
-interpreter.run()
+try:
+    if args.input:
+        program_input = ListInput.from_file(args.input, args.input_errors)
+    else:
+        program_input = ConsoleInput(args.input_errors)
+except OSError as e:
+    fail(f"Não foi possível ler {args.input}: {e.strerror}")
+
+# Com --sort, o backend tree recebe o SortedProgram da AST final
+# (depois do otimizador e do peephole), com os destinos dos saltos
+# já calculados; os backends compilados já resolvem os saltos na carga
+program = ast
+if args.sort and args.backend == "tree":
+    program = sort_program(ast)
+
+try:
+    interpreter = load_backend(args.backend)(program, output=BufferedOutput(flush=args.flush),
+                                             input=program_input)
+    for spec in args.array:
+        name, _, path = spec.partition("=")
+        try:
+            interpreter.arrays.load(name.upper(), path)
+        except OSError as e:
+            fail(f"Não foi possível ler {path}: {e.strerror}")
+    if args.checkpoint:
+        from checkpoint import Checkpoint, DEFAULT_EVERY, program_hash
+        if data is None:
+            with open(args.program, "rb") as f:
+                data = f.read()
+        checkpoint = Checkpoint(args.checkpoint, program_hash(data, ast),
+                                args.checkpoint_every or DEFAULT_EVERY)
+        if args.resume:
+            try:
+                checkpoint.restore(interpreter)
+            except OSError as e:
+                fail(f"Não foi possível ler {args.checkpoint}: {e.strerror}")
+            if args.verbose:
+                print(f"Retomando do checkpoint após {interpreter.steps} passos")
+                separator()
+        checkpoint.run(interpreter, max_steps=args.max_steps)
+    elif args.trace_stats:
+        try:
+            interpreter.run(max_steps=args.max_steps)
+        finally:
+            separator()
+            print(interpreter.report())
+    elif not args.profile:
+        interpreter.run(max_steps=args.max_steps)
+    else:
+        from profiler import LineProfiler
+        profiler = LineProfiler(interpreter)
+        try:
+            interpreter.run(max_steps=args.max_steps)
+        finally:
+            separator()
+            print(profiler.report())
+            if args.profile_json:
+                profiler.write_json(args.profile_json)
+            if args.profile_collapsed:
+                profiler.write_collapsed(args.profile_collapsed)
+except Exception as e:
+    fail(f"Erro: {e}")
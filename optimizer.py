@@ -0,0 +1,228 @@
+# optimizer.py
+# -----------------------------
+# Otimizador da AST do TinyBasic
+# Estágio opcional entre o Parser e o Interpreter:
+#   nível 1: dobra constantes, simplifica identidades (x*1, x+0, ...)
+#            e resolve IFs com condição constante
+#   nível 2: nível 1 + remove statements após saltos incondicionais
+#            e linhas que nunca podem ser alcançadas
+# O nível 2 vale para todos os backends ao mesmo tempo: o retorno
+# de GOSUB é a linha seguinte no tree/closure/trace e o statement
+# seguinte na VM, e os dois pontos de retorno são mantidos.
+# A semântica do eval_expr é mantida: divisão inteira (//) e
+# divisão por zero continuam dando erro só quando executadas.
+# -----------------------------
+
+
+# ============================================================
+# Relatório do que o otimizador mudou
+# --------------------------------------------------------
+class OptimizationReport:
+    def __init__(self, level):
+        self.level = level
+        self.folded = 0            # expressões constantes dobradas
+        self.simplified = 0        # identidades simplificadas
+        self.constant_ifs = 0      # IFs com condição constante
+        self.removed_stmts = []    # (linha, statement) mortos
+        self.removed_lines = []    # números de linhas inalcançáveis
+
+    def __str__(self):
+        out = [f"Otimização nível {self.level}:",
+               f"  expressões constantes dobradas: {self.folded}",
+               f"  identidades simplificadas: {self.simplified}",
+               f"  IFs com condição constante: {self.constant_ifs}",
+               f"  statements mortos removidos: {len(self.removed_stmts)}"]
+        for line_num, stmt in self.removed_stmts:
+            out.append(f"    linha {line_num}: {stmt}")
+        out.append(f"  linhas inalcançáveis removidas: {len(self.removed_lines)}")
+        if self.removed_lines:
+            out.append("    " + ", ".join(str(num) for num in self.removed_lines))
+        return "\n".join(out)
+
+
+# ============================================================
+# Função principal: otimiza a AST e devolve (ast, relatório)
+# --------------------------------------------------------
+def optimize(ast, level=1):
+    report = OptimizationReport(level)
+    if level <= 0:
+        return ast, report
+
+    line_nums = {line_num for _, line_num, _ in ast}
+    lines = []
+    for _, line_num, stmt_list in ast:
+        stmts = [fold_stmt(stmt, line_nums, report) for stmt in stmt_list]
+        stmts = [stmt for stmt in stmts if stmt is not None]
+        if not stmts:
+            stmts = [("REM",)]     # a linha continua existindo como destino
+        lines.append(("LINE", line_num, stmts))
+
+    if level >= 2:
+        lines = [("LINE", line_num, drop_dead_stmts(line_num, stmts, report))
+                 for _, line_num, stmts in lines]
+        lines = drop_unreachable_lines(lines, report)
+    return lines, report
+
+
+# ============================================================
+# Nível 1: dobra de constantes e identidades
+# --------------------------------------------------------
+def fold_stmt(stmt, line_nums, report):
+    t = stmt[0]
+    if t == "LET":
+        _, var, expr = stmt
+        return ("LET", var, fold_expr(expr, report))
+    elif t == "LET_INDEX":
+        _, var, index, expr = stmt
+        return ("LET_INDEX", var, fold_expr(index, report), fold_expr(expr, report))
+    elif t in ("DIM", "INPUT_INDEX"):
+        _, var, expr = stmt
+        return (t, var, fold_expr(expr, report))
+    elif t == "PRINT":
+        _, items = stmt
+        return ("PRINT", [item if item[0] == "STR" else fold_expr(item, report)
+                          for item in items])
+    elif t == "IF":
+        _, cond, line_num = stmt
+        _, left, op, right = cond
+        left = fold_expr(left, report)
+        right = fold_expr(right, report)
+        if left[0] == "NUMBER" and right[0] == "NUMBER":
+            # Condição constante: vira GOTO ou desaparece
+            # (destino inexistente fica como IF para manter a mensagem de erro)
+            taken = compare(op, left[1], right[1])
+            if not taken or line_num in line_nums:
+                report.constant_ifs += 1
+                return ("GOTO", line_num) if taken else None
+        return ("IF", ("COND", left, op, right), line_num)
+    return stmt
+
+
+def fold_expr(expr, report):
+    if expr[0] == "INDEX":
+        return ("INDEX", expr[1], fold_expr(expr[2], report))
+    if expr[0] != "BINOP":
+        return expr
+    _, op, left, right = expr
+    left = fold_expr(left, report)
+    right = fold_expr(right, report)
+
+    # Dois operandos constantes: calcula já (exceto divisão por zero,
+    # que precisa continuar falhando em tempo de execução)
+    if left[0] == "NUMBER" and right[0] == "NUMBER":
+        a, b = left[1], right[1]
+        if op == "PLUS":
+            value = a + b
+        elif op == "MINUS":
+            value = a - b
+        elif op == "MUL":
+            value = a * b
+        elif op == "DIV" and b != 0:
+            value = a // b
+        else:
+            return ("BINOP", op, left, right)
+        report.folded += 1
+        return ("NUMBER", value)
+
+    # Identidades: x+0, 0+x, x-0, x*1, 1*x, x/1
+    if (op in ("PLUS", "MINUS") and is_const(right, 0)) or \
+            (op in ("MUL", "DIV") and is_const(right, 1)):
+        report.simplified += 1
+        return left
+    if (op == "PLUS" and is_const(left, 0)) or (op == "MUL" and is_const(left, 1)):
+        report.simplified += 1
+        return right
+
+    # x*0 e 0*x só viram 0 se x não puder falhar (sem divisão)
+    if op == "MUL" and ((is_const(right, 0) and is_safe(left)) or
+                        (is_const(left, 0) and is_safe(right))):
+        report.simplified += 1
+        return ("NUMBER", 0)
+
+    return ("BINOP", op, left, right)
+
+
+def is_const(expr, value):
+    return expr[0] == "NUMBER" and expr[1] == value
+
+
+def is_safe(expr):
+    # Expressão que nunca gera erro (sem divisão nem índice de array)
+    if expr[0] == "BINOP":
+        return expr[1] != "DIV" and is_safe(expr[2]) and is_safe(expr[3])
+    return expr[0] != "INDEX"
+
+
+def compare(op, a, b):
+    if op == "EQ":
+        return a == b
+    elif op == "NE":
+        return a != b
+    elif op == "LT":
+        return a < b
+    elif op == "GT":
+        return a > b
+    elif op == "LE":
+        return a <= b
+    elif op == "GE":
+        return a >= b
+    raise Exception(f"Operador relacional inesperado: {op}")
+
+
+# ============================================================
+# Nível 2: código morto
+# --------------------------------------------------------
+# Statements depois dos quais o resto da linha nunca executa
+# (em qualquer backend; GOSUB fica de fora porque a VM retorna
+# para o statement seguinte, que precisa continuar existindo)
+TERMINATORS = ("GOTO", "RETURN", "END")
+
+
+def drop_dead_stmts(line_num, stmts, report):
+    for i, stmt in enumerate(stmts):
+        if stmt[0] in TERMINATORS:
+            for dead in stmts[i + 1:]:
+                report.removed_stmts.append((line_num, dead))
+            return stmts[:i + 1]
+    return stmts
+
+
+def drop_unreachable_lines(lines, report):
+    # Mesmo mapeamento do Interpreter: número da linha -> último índice
+    line_map = {}
+    for i, (_, line_num, _) in enumerate(lines):
+        line_map[line_num] = i
+
+    reachable = set()
+    pending = [0] if lines else []
+    while pending:
+        i = pending.pop()
+        if i in reachable or i >= len(lines):
+            continue
+        reachable.add(i)
+        falls_through = True
+        for stmt in lines[i][2]:
+            t = stmt[0]
+            if t in ("GOTO", "IF", "GOSUB"):
+                # Destinos inexistentes ficam para o erro em tempo de execução
+                target = line_map.get(stmt[-1])
+                if target is not None:
+                    pending.append(target)
+            if t == "GOSUB":
+                # Ponto de retorno no tree/closure/trace: a linha seguinte,
+                # mesmo que o resto desta linha termine em GOTO/RETURN/END.
+                # (Na VM o retorno é o statement seguinte, visto no laço.)
+                pending.append(i + 1)
+            if t in TERMINATORS:
+                falls_through = False
+                break
+        if falls_through:
+            pending.append(i + 1)
+
+    kept = []
+    for i, line in enumerate(lines):
+        if i in reachable:
+            kept.append(line)
+        else:
+            report.removed_lines.append(line[1])
+    return kept
@@ -0,0 +1,95 @@
+# parallel_frontend.py
+# -----------------------------
+# TinyBasic - Front end paralelo (lexer + parser em vários processos)
+# Cada linha do TinyBasic é independente: o Parser só precisa dos
+# tokens até o NEWLINE. O fonte é dividido em blocos de linhas
+# inteiras, cada bloco passa pelo lexer e pelo Parser em um processo
+# do pool e as linhas voltam na ordem original.
+# Cada bloco começa o lexer com a linha e a posição absolutas do seu
+# início (lexer_stream(line_num=..., offset=...)), então tokens, erros
+# e diagnósticos citam as mesmas linhas e colunas do caminho serial.
+# -----------------------------
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import lexer, lexer_stream
+from parser import Parser, ParseError
+
+MIN_PARALLEL_SIZE = 256 * 1024    # abaixo disso o pool custa mais do que economiza
+CHUNKS_PER_WORKER = 4             # blocos por processo (equilibra a carga)
+
+
+# ============================================================
+# Divide o fonte em blocos que terminam em fim de linha
+# Devolve [(texto, linha inicial, posição inicial)]
+# --------------------------------------------------------
+def split_chunks(code, count):
+    size = max(1, len(code) // max(1, count))
+    chunks = []
+    start, line_num = 0, 1
+    while start < len(code):
+        end = code.find("\n", min(start + size, len(code)) - 1)
+        end = len(code) if end == -1 else end + 1
+        text = code[start:end]
+        chunks.append((text, line_num, start))
+        line_num += text.count("\n")
+        start = end
+    return chunks
+
+
+def parse_chunk(chunk):
+    # Roda no processo do pool: linhas e diagnósticos do bloco
+    text, line_num, offset = chunk
+    tokens = list(lexer_stream([text], line_num=line_num, offset=offset))
+    parser = Parser(tokens)
+    lines = parser.parse_program(strict=False)
+    return lines, parser.diagnostics
+
+
+# ============================================================
+# Função principal: mesma AST (e os mesmos erros) de
+# Parser(lexer(code)).parse_program()
+# --------------------------------------------------------
+def parse_parallel(code, workers=None, strict=True, min_size=MIN_PARALLEL_SIZE):
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(code) < min_size:
+        parser = Parser(lexer(code))
+        lines = parser.parse_program(strict)
+        return lines
+
+    chunks = split_chunks(code, workers * CHUNKS_PER_WORKER)
+    lines, diagnostics = [], []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Erro léxico: map() relança o do primeiro bloco, como no serial
+        for chunk_lines, chunk_diagnostics in executor.map(parse_chunk, chunks):
+            lines.extend(chunk_lines)
+            diagnostics.extend(chunk_diagnostics)
+    if diagnostics and strict:
+        raise ParseError(diagnostics)
+    return lines
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compara o front end serial e o paralelo")
+    arg_parser.add_argument("program", help="arquivo do programa")
+    arg_parser.add_argument("--jobs", "-j", type=int,
+                            help="processos (padrão: número de CPUs)")
+    args = arg_parser.parse_args()
+
+    with open(args.program, "r", encoding="utf-8") as f:
+        code = f.read()
+    start = time.perf_counter()
+    serial = Parser(lexer(code)).parse_program()
+    serial_time = time.perf_counter() - start
+    start = time.perf_counter()
+    parallel = parse_parallel(code, args.jobs, min_size=0)
+    parallel_time = time.perf_counter() - start
+
+    print(f"Linhas: {len(serial)}")
+    print(f"Serial:   {serial_time:.3f}s")
+    print(f"Paralelo: {parallel_time:.3f}s ({serial_time / parallel_time:.2f}x, "
+          f"{args.jobs or os.cpu_count()} processos)")
+    print("AST idêntica" if serial == parallel else "AST DIFERENTE")
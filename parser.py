@@ -3,32 +3,115 @@
 # Parser do TinyBasic
 # Constrói a AST (Abstract Syntax Tree) a partir da lista de tokens
 # Cada linha do programa vira um nó na árvore
+#
+# Statements e expressões são despachados por tabelas indexadas pelo
+# tipo do token (STATEMENTS, PREFIX, BINARY); as expressões usam um
+# parser de Pratt com precedência por "binding power". O menos unário
+# vira ("BINOP", "MINUS", ("NUMBER", 0), x), ou direto um NUMBER
+# negativo para constantes, e os backends não precisam de nó novo.
+# Arrays (ver arrays.py): DIM A(n) vira ("DIM", "A", n), A(i) em
+# expressões vira ("INDEX", "A", i) e LET/INPUT com índice viram
+# ("LET_INDEX", "A", i, expr) e ("INPUT_INDEX", "A", i).
+#
+# Erros de sintaxe não param a análise: a linha com erro é descartada
+# até o próximo NEWLINE e o parse continua. No fim, parse_program()
+# lança ParseError com a lista de todos os diagnósticos.
 # -----------------------------
 
-from token import Token
+from tokens import Token, TokenBuffer, TokenCursor
+
+
+# ============================================================
+# Diagnósticos
+# --------------------------------------------------------
+class Diagnostic:
+    def __init__(self, message, line, column):
+        self.message = message      # texto do erro
+        self.line = line            # linha do fonte onde foi encontrado
+        self.column = column        # coluna (posição) do token no fonte
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f"Diagnostic({self.message!r}, linha={self.line}, coluna={self.column})"
+
+
+# Erro de sintaxe com todos os diagnósticos encontrados
+class ParseError(Exception):
+    def __init__(self, diagnostics):
+        super().__init__("\n".join(d.message for d in diagnostics))
+        self.diagnostics = diagnostics
+
+
+# Binding power dos operadores binários (maior = liga mais forte)
+BINARY = {"PLUS": 10, "MINUS": 10, "MUL": 20, "DIV": 20}
+UNARY_POWER = 30                    # menos unário liga mais que * e /
+RELATIONAL = frozenset(("EQ", "NE", "LT", "GT", "LE", "GE"))
+
 
 class Parser:
     def __init__(self, tokens):
-        self.tokens = tokens       # lista de tokens vinda do lexer
         self.pos = 0               # posição atual na lista
-        self.current_token = self.tokens[self.pos]  # token atual
+        self.cursor = None
+        self.diagnostics = []      # erros de sintaxe de parse_program()
+        if isinstance(tokens, list):
+            self.tokens = tokens   # lista de tokens vinda do lexer
+            self.stream = None
+            self.current_token = self.tokens[self.pos]  # token atual
+        elif isinstance(tokens, TokenBuffer):
+            # Buffer compacto: um cursor reaproveitado lê os arrays
+            self.tokens = tokens
+            self.stream = None
+            self.cursor = TokenCursor(tokens, self.pos)
+            self.current_token = self.cursor
+        else:
+            # Modo streaming: consome um iterador (ex.: lexer_stream)
+            # guardando só um token de lookahead
+            self.tokens = None
+            self.stream = iter(tokens)
+            self.current_token = next(self.stream, None) or Token("EOF", "$", -1, -1)
 
     # -----------------------------
     # Avança para o próximo token
     # -----------------------------
     def advance(self):
         self.pos += 1
-        if self.pos < len(self.tokens):
-            self.current_token = self.tokens[self.pos]
+        if self.stream is not None:
+            self.current_token = next(self.stream, None) or Token("EOF", "$", -1, -1)
+        elif self.pos < len(self.tokens):
+            if self.cursor is not None:
+                self.cursor.index = self.pos
+            else:
+                self.current_token = self.tokens[self.pos]
         else:
             # Se acabou, cria token EOF
             self.current_token = Token("EOF", "$", -1, -1)
 
+    # -----------------------------
+    # Erro de sintaxe no token atual (ou em `line`)
+    # -----------------------------
+    def error(self, message, line=None):
+        token = self.current_token
+        raise ParseError([Diagnostic(message, token.line if line is None else line,
+                                     token.column)])
+
+    def expect_line_number(self, keyword):
+        num_token = self.current_token
+        if num_token.type != "NUMBER":
+            self.error(f"Esperado número de linha após {keyword}, encontrado "
+                       f"{num_token.type} na linha {num_token.line}")
+        target = num_token.value
+        self.advance()
+        return target
+
     # ========================================================
     # Função principal: parse_program
     # Retorna uma lista de linhas, cada linha com seus statements
+    # Com strict=False não lança ParseError: devolve as linhas
+    # válidas e os erros ficam em self.diagnostics
     # --------------------------------------------------------
-    def parse_program(self):
+    def parse_program(self, strict=True):
         lines = []
         while self.current_token.type != "EOF":
             # Ignora comentários que possam estar isolados
@@ -36,9 +119,22 @@ class Parser:
                 self.advance()
             if self.current_token.type == "EOF":
                 break
-            lines.append(self.parse_line())
+            try:
+                lines.append(self.parse_line())
+            except ParseError as e:
+                self.diagnostics.extend(e.diagnostics)
+                self.synchronize()
+        if self.diagnostics and strict:
+            raise ParseError(self.diagnostics)
         return lines
 
+    # Recuperação de erro: descarta o resto da linha até o NEWLINE
+    def synchronize(self):
+        while self.current_token.type not in ("NEWLINE", "EOF"):
+            self.advance()
+        if self.current_token.type == "NEWLINE":
+            self.advance()
+
     # ========================================================
     # Parse de uma linha:
     # Formato: NUMERO statements NEWLINE
@@ -46,7 +142,9 @@ class Parser:
     def parse_line(self):
         num = self.current_token
         if num.type != "NUMBER":
-            raise Exception(f"Era esperado número de linha, encontrado {num.type} na linha {num.line}")
+            self.error(f"Era esperado número de linha, encontrado {num.type} na linha {num.line}")
+        # Guarda os campos antes de avançar (o token pode ser um cursor)
+        line_value, line_pos = num.value, num.line
         self.advance()
 
         stmt_list = self.parse_stmt_list()  # lista de statements separados por ":"
@@ -56,10 +154,11 @@ class Parser:
         elif self.current_token.type == "EOF":
             pass  # final do arquivo
         else:
-            raise Exception(f"Esperado NEWLINE após a linha, encontrado {self.current_token.type} na linha {num.line}")
+            self.error(f"Esperado NEWLINE após a linha, encontrado "
+                       f"{self.current_token.type} na linha {line_pos}", line_pos)
 
         # Retorna a linha como tupla: ("LINE", numero_da_linha, [statements])
-        return ("LINE", num.value, stmt_list)
+        return ("LINE", line_value, stmt_list)
 
     # ========================================================
     # Lista de statements (separados por ":")
@@ -72,34 +171,20 @@ class Parser:
         return stmts
 
     # ========================================================
-    # Parse de um statement individual
+    # Parse de um statement individual (tabela STATEMENTS)
     # --------------------------------------------------------
     def parse_stmt(self):
-        t = self.current_token.type
+        handler = self.STATEMENTS.get(self.current_token.type)
+        if handler is None:
+            self.error(f"Comando inesperado {self.current_token.type} "
+                       f"na linha {self.current_token.line}")
+        return handler(self)
 
-        if t == "LET":
-            return self.parse_let()
-        elif t == "PRINT":
-            return self.parse_print()
-        elif t == "INPUT":
-            return self.parse_input()
-        elif t == "IF":
-            return self.parse_if()
-        elif t == "GOTO":
-            return self.parse_goto()
-        elif t == "GOSUB":
-            return self.parse_gosub()
-        elif t == "RETURN":
-            self.advance()
-            return ("RETURN",)
-        elif t == "END":
-            self.advance()
-            return ("END",)
-        elif t == "REM":
-            self.advance()
-            return ("REM",)
-        else:
-            raise Exception(f"Comando inesperado {t} na linha {self.current_token.line}")
+    # RETURN, END e REM: só a palavra-chave
+    def parse_keyword(self):
+        t = self.current_token.type
+        self.advance()
+        return (t,)
 
     # ========================================================
     # Parse do LET statement
@@ -109,15 +194,45 @@ class Parser:
         self.advance()  # consome LET
         var_token = self.current_token
         if var_token.type != "ID":
-            raise Exception(f"Era esperado ID após LET, encontrado {var_token.type} na linha {var_token.line}")
+            self.error(f"Era esperado ID após LET, encontrado {var_token.type} na linha {var_token.line}")
+        var, var_line = var_token.value, var_token.line
         self.advance()
+        index = self.parse_subscript() if self.current_token.type == "LPAREN" else None
 
         if self.current_token.type != "EQ":
-            raise Exception(f"Era esperado '=' após ID, encontrado {self.current_token.type} na linha {var_token.line}")
+            self.error(f"Era esperado '=' após ID, encontrado "
+                       f"{self.current_token.type} na linha {var_line}", var_line)
         self.advance()
 
         expr = self.parse_expr()
-        return ("LET", var_token.value, expr)
+        if index is not None:
+            return ("LET_INDEX", var, index, expr)
+        return ("LET", var, expr)
+
+    # Índice ou tamanho de array: ( EXPR )
+    def parse_subscript(self):
+        self.advance()  # consome (
+        expr = self.parse_expr()
+        if self.current_token.type != "RPAREN":
+            self.error(f"Esperado ')' na linha {self.current_token.line}")
+        self.advance()
+        return expr
+
+    # ========================================================
+    # Parse do DIM statement
+    # Formato: DIM ID ( EXPR )
+    # --------------------------------------------------------
+    def parse_dim(self):
+        self.advance()  # consome DIM
+        var_token = self.current_token
+        if var_token.type != "ID":
+            self.error(f"Esperado ID após DIM, encontrado {var_token.type} na linha {var_token.line}")
+        var = var_token.value
+        self.advance()
+        if self.current_token.type != "LPAREN":
+            self.error(f"Esperado '(' após DIM {var}, encontrado "
+                       f"{self.current_token.type} na linha {self.current_token.line}")
+        return ("DIM", var, self.parse_subscript())
 
     # ========================================================
     # Parse do PRINT statement
@@ -137,10 +252,10 @@ class Parser:
             value = self.current_token.value
             self.advance()
             return ("STR", value)
-        elif t in ("NUMBER", "ID", "LPAREN"):
+        elif t in self.PREFIX:
             return self.parse_expr()
         else:
-            raise Exception(f"PRINT token inesperado {t} na linha {self.current_token.line}")
+            self.error(f"PRINT token inesperado {t} na linha {self.current_token.line}")
 
     # ========================================================
     # Parse do INPUT statement
@@ -150,9 +265,12 @@ class Parser:
         self.advance()  # consome INPUT
         var_token = self.current_token
         if var_token.type != "ID":
-            raise Exception(f"Esperado ID após INPUT, encontrado {var_token.type} na linha {var_token.line}")
+            self.error(f"Esperado ID após INPUT, encontrado {var_token.type} na linha {var_token.line}")
+        var = var_token.value
         self.advance()
-        return ("INPUT", var_token.value)
+        if self.current_token.type == "LPAREN":
+            return ("INPUT_INDEX", var, self.parse_subscript())
+        return ("INPUT", var)
 
     # ========================================================
     # Parse do IF statement
@@ -162,86 +280,88 @@ class Parser:
         self.advance()  # consome IF
         cond = self.parse_cond()
         if self.current_token.type != "THEN":
-            raise Exception(f"Esperado THEN após condição, encontrado {self.current_token.type} na linha {self.current_token.line}")
-        self.advance()
-        num_token = self.current_token
-        if num_token.type != "NUMBER":
-            raise Exception(f"Esperado número de linha após THEN, encontrado {num_token.type} na linha {num_token.line}")
+            self.error(f"Esperado THEN após condição, encontrado "
+                       f"{self.current_token.type} na linha {self.current_token.line}")
         self.advance()
-        return ("IF", cond, num_token.value)
+        return ("IF", cond, self.expect_line_number("THEN"))
 
     # Parse de condição (expressão relacional)
     def parse_cond(self):
         left = self.parse_expr()
         op = self.current_token.type
-        if op not in ("EQ", "NE", "LT", "GT", "LE", "GE"):
-            raise Exception(f"Operador relacional esperado, encontrado {op} na linha {self.current_token.line}")
+        if op not in RELATIONAL:
+            self.error(f"Operador relacional esperado, encontrado {op} na linha {self.current_token.line}")
         self.advance()
         right = self.parse_expr()
         return ("COND", left, op, right)
 
     # ========================================================
-    # Parse do GOTO statement
-    # Formato: GOTO NUM
+    # GOTO NUM / GOSUB NUM
     # --------------------------------------------------------
     def parse_goto(self):
         self.advance()
-        num_token = self.current_token
-        if num_token.type != "NUMBER":
-            raise Exception(f"Esperado número de linha após GOTO, encontrado {num_token.type} na linha {num_token.line}")
-        self.advance()
-        return ("GOTO", num_token.value)
+        return ("GOTO", self.expect_line_number("GOTO"))
 
-    # ========================================================
-    # Parse do GOSUB statement
-    # Formato: GOSUB NUM
-    # --------------------------------------------------------
     def parse_gosub(self):
         self.advance()
-        num_token = self.current_token
-        if num_token.type != "NUMBER":
-            raise Exception(f"Esperado número de linha após GOSUB, encontrado {num_token.type} na linha {num_token.line}")
-        self.advance()
-        return ("GOSUB", num_token.value)
+        return ("GOSUB", self.expect_line_number("GOSUB"))
 
     # ========================================================
-    # EXPRESSÕES (Expr, Term, Factor)
-    # Implementa precedência de operadores (+,- antes de *,/)
+    # EXPRESSÕES (parser de Pratt)
+    # Um operando (tabela PREFIX) e, enquanto o operador seguinte
+    # ligar mais forte que `power`, um BINOP com o lado direito.
+    # Operadores de mesma precedência associam à esquerda.
     # --------------------------------------------------------
-    def parse_expr(self):
-        node = self.parse_term()
-        while self.current_token.type in ("PLUS", "MINUS"):
-            op = self.current_token.type
+    def parse_expr(self, power=0):
+        handler = self.PREFIX.get(self.current_token.type)
+        if handler is None:
+            self.error(f"Factor inesperado {self.current_token.type} "
+                       f"na linha {self.current_token.line}")
+        node = handler(self)
+        op = self.current_token.type
+        while BINARY.get(op, 0) > power:
             self.advance()
-            right = self.parse_term()
-            node = ("BINOP", op, node, right)
+            node = ("BINOP", op, node, self.parse_expr(BINARY[op]))
+            op = self.current_token.type
         return node
 
-    def parse_term(self):
-        node = self.parse_factor()
-        while self.current_token.type in ("MUL", "DIV"):
-            op = self.current_token.type
-            self.advance()
-            right = self.parse_factor()
-            node = ("BINOP", op, node, right)
+    def parse_number(self):
+        value = self.current_token.value
+        self.advance()
+        return ("NUMBER", value)
+
+    def parse_id(self):
+        name = self.current_token.value
+        self.advance()
+        if self.current_token.type == "LPAREN":
+            return ("INDEX", name, self.parse_subscript())
+        return ("ID", name)
+
+    def parse_group(self):
+        self.advance()
+        node = self.parse_expr()
+        if self.current_token.type != "RPAREN":
+            self.error(f"Esperado ')' na linha {self.current_token.line}")
+        self.advance()
         return node
 
-    def parse_factor(self):
-        t = self.current_token.type
-        if t == "NUMBER":
-            value = self.current_token.value
-            self.advance()
-            return ("NUMBER", value)
-        elif t == "ID":
-            name = self.current_token.value
-            self.advance()
-            return ("ID", name)
-        elif t == "LPAREN":
-            self.advance()
-            node = self.parse_expr()
-            if self.current_token.type != "RPAREN":
-                raise Exception(f"Esperado ')' na linha {self.current_token.line}")
-            self.advance()
-            return node
-        else:
-            raise Exception(f"Factor inesperado {t} na linha {self.current_token.line}")
+    def parse_negate(self):
+        self.advance()
+        operand = self.parse_expr(UNARY_POWER)
+        if operand[0] == "NUMBER":
+            return ("NUMBER", -operand[1])
+        return ("BINOP", "MINUS", ("NUMBER", 0), operand)
+
+    # ========================================================
+    # Tabelas de despacho (tipo do token -> método)
+    # --------------------------------------------------------
+    STATEMENTS = {
+        "LET": parse_let, "PRINT": parse_print, "INPUT": parse_input,
+        "IF": parse_if, "GOTO": parse_goto, "GOSUB": parse_gosub,
+        "RETURN": parse_keyword, "END": parse_keyword, "REM": parse_keyword,
+        "DIM": parse_dim,
+    }
+    PREFIX = {
+        "NUMBER": parse_number, "ID": parse_id, "LPAREN": parse_group,
+        "MINUS": parse_negate,
+    }
@@ -0,0 +1,145 @@
+# peephole.py
+# -----------------------------
+# Passo peephole do TinyBasic
+# Troca padrões comuns das listas de statements por
+# superinstruções, para o Interpreter despachar menos:
+#   LET I = I + 1 / I - 1 / 1 + I       -> ("INC", "I", 1)
+#   IF c THEN 100 : GOTO 50             -> ("IFELSE", c, 100, 50)
+#   IF c THEN 100 (fim da linha) seguido
+#   de uma linha só com GOTO 50         -> ("IFELSE", c, 100, 50)
+#   REM no meio da linha                -> removido
+#   linhas só com REM                   -> removidas; saltos para
+#                                          elas vão para a seguinte
+# Roda depois do optimizer e antes dos backends. A saída do
+# programa é a mesma; só o número de passos executados diminui.
+# -----------------------------
+
+
+# ============================================================
+# Relatório do que o passo mudou
+# --------------------------------------------------------
+class PeepholeReport:
+    def __init__(self):
+        self.increments = 0        # LETs trocados por INC
+        self.branches = 0          # IF + GOTO fundidos em IFELSE
+        self.removed_rems = 0      # REMs removidos de linhas com código
+        self.removed_lines = []    # números das linhas só com REM removidas
+
+    def __str__(self):
+        out = ["Peephole:",
+               f"  incrementos (INC): {self.increments}",
+               f"  IF + GOTO fundidos (IFELSE): {self.branches}",
+               f"  REMs removidos: {self.removed_rems}",
+               f"  linhas só com REM removidas: {len(self.removed_lines)}"]
+        if self.removed_lines:
+            out.append("    " + ", ".join(str(num) for num in self.removed_lines))
+        return "\n".join(out)
+
+
+# ============================================================
+# Função principal: devolve (ast, relatório)
+# --------------------------------------------------------
+def peephole(ast):
+    report = PeepholeReport()
+    lines = remove_rem_lines(ast, report)
+    out = []
+    for i, (_, line_num, stmts) in enumerate(lines):
+        stmts = [fuse_increment(stmt, report) for stmt in stmts]
+        stmts = fuse_branches(stmts, lines[i + 1] if i + 1 < len(lines) else None, report)
+        out.append(("LINE", line_num, stmts))
+    return out, report
+
+
+# ============================================================
+# LET V = V + c, LET V = c + V, LET V = V - c  ->  INC
+# --------------------------------------------------------
+def fuse_increment(stmt, report):
+    if stmt[0] != "LET" or stmt[2][0] != "BINOP":
+        return stmt
+    _, var, (_, op, left, right) = stmt
+    if op == "PLUS" and left == ("ID", var) and right[0] == "NUMBER":
+        amount = right[1]
+    elif op == "PLUS" and right == ("ID", var) and left[0] == "NUMBER":
+        amount = left[1]
+    elif op == "MINUS" and left == ("ID", var) and right[0] == "NUMBER":
+        amount = -right[1]
+    else:
+        return stmt
+    report.increments += 1
+    return ("INC", var, amount)
+
+
+# ============================================================
+# IF seguido de GOTO (na mesma linha ou na linha seguinte,
+# quando ela só tem o GOTO) -> IFELSE com os dois destinos
+# --------------------------------------------------------
+def fuse_branches(stmts, next_line, report):
+    out = []
+    i = 0
+    while i < len(stmts):
+        stmt = stmts[i]
+        if stmt[0] == "IF":
+            _, cond, then_line = stmt
+            if i + 1 < len(stmts) and stmts[i + 1][0] == "GOTO":
+                out.append(("IFELSE", cond, then_line, stmts[i + 1][1]))
+                report.branches += 1
+                i += 2
+                continue
+            if (i + 1 == len(stmts) and next_line is not None and
+                    len(next_line[2]) == 1 and next_line[2][0][0] == "GOTO"):
+                # A linha do GOTO continua existindo (pode ser destino)
+                out.append(("IFELSE", cond, then_line, next_line[2][0][1]))
+                report.branches += 1
+                i += 1
+                continue
+        out.append(stmt)
+        i += 1
+    return out
+
+
+# ============================================================
+# REM: some do meio das linhas; linhas só com REM saem do
+# programa e os saltos para elas passam a ir para a próxima
+# --------------------------------------------------------
+def remove_rem_lines(ast, report):
+    counts = {}
+    for _, line_num, _ in ast:
+        counts[line_num] = counts.get(line_num, 0) + 1
+
+    lines = []
+    for _, line_num, stmts in ast:
+        code = [stmt for stmt in stmts if stmt[0] != "REM"]
+        if code:
+            report.removed_rems += len(stmts) - len(code)
+            lines.append(("LINE", line_num, code))
+        else:
+            lines.append(("LINE", line_num, stmts))
+
+    # Linha só com REM -> número da próxima linha com código. Ficam
+    # as com número repetido e as do fim (saltar para elas termina
+    # o programa)
+    redirect = {}
+    for i, (_, line_num, stmts) in enumerate(lines):
+        if any(stmt[0] != "REM" for stmt in stmts) or counts[line_num] > 1:
+            continue
+        for _, next_num, next_stmts in lines[i + 1:]:
+            if any(stmt[0] != "REM" for stmt in next_stmts):
+                if counts[next_num] == 1:
+                    redirect[line_num] = next_num
+                break
+
+    if not redirect:
+        return lines
+    report.removed_lines = sorted(redirect)
+    return [("LINE", line_num, [retarget(stmt, redirect) for stmt in stmts])
+            for _, line_num, stmts in lines if line_num not in redirect]
+
+
+def retarget(stmt, redirect):
+    t = stmt[0]
+    if t in ("GOTO", "GOSUB"):
+        return (t, redirect.get(stmt[1], stmt[1]))
+    if t == "IF":
+        _, cond, line_num = stmt
+        return ("IF", cond, redirect.get(line_num, line_num))
+    return stmt
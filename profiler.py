@@ -0,0 +1,105 @@
+# profiler.py
+# -----------------------------
+# Profiler por linha do TinyBasic
+# Conta execuções, tempo acumulado e chamadas GOSUB por número de
+# linha. Funciona trocando execute_line/execute_stmt da instância do
+# Interpreter por versões medidas: sem profiler, o interpretador
+# roda exatamente o código original (custo zero).
+# -----------------------------
+
+import json
+import time
+
+
+class LineProfiler:
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.counts = {}         # linha -> execuções
+        self.times = {}          # linha -> tempo acumulado (s)
+        self.gosub_calls = {}    # linha destino do GOSUB -> chamadas
+        self.stack_times = {}    # (sub-rotinas ativas, linha) -> tempo (s)
+        self.frames = []         # sub-rotinas ativas (paralelo ao call_stack)
+        self.install()
+
+    # ========================================================
+    # Instala as versões medidas na instância do Interpreter
+    # --------------------------------------------------------
+    def install(self):
+        interp = self.interpreter
+        execute_line = interp.execute_line
+        execute_stmt = interp.execute_stmt
+        ast = interp.ast
+        counts, times, stack_times = self.counts, self.times, self.stack_times
+        frames = self.frames
+        clock = time.perf_counter
+
+        def profiled_line(index):
+            line_num = ast[index][1]
+            key = (tuple(frames), line_num)
+            start = clock()
+            try:
+                return execute_line(index)
+            finally:
+                elapsed = clock() - start
+                counts[line_num] = counts.get(line_num, 0) + 1
+                times[line_num] = times.get(line_num, 0.0) + elapsed
+                stack_times[key] = stack_times.get(key, 0.0) + elapsed
+
+        def profiled_stmt(stmt, current_index):
+            result = execute_stmt(stmt, current_index)
+            if stmt[0] == "GOSUB":
+                target = stmt[1]
+                self.gosub_calls[target] = self.gosub_calls.get(target, 0) + 1
+                frames.append(target)
+            elif stmt[0] == "RETURN":
+                del frames[len(interp.call_stack):]
+            return result
+
+        interp.execute_line = profiled_line
+        interp.execute_stmt = profiled_stmt
+
+    def uninstall(self):
+        del self.interpreter.execute_line
+        del self.interpreter.execute_stmt
+
+    # ========================================================
+    # Relatórios
+    # --------------------------------------------------------
+    def hot_lines(self):
+        # Linhas ordenadas pelo tempo acumulado (mais quentes primeiro)
+        return sorted(self.counts, key=lambda num: self.times[num], reverse=True)
+
+    def report(self, limit=20):
+        total = sum(self.times.values()) or 1e-12
+        out = ["Linhas mais quentes:",
+               f"{'linha':>8} {'execuções':>12} {'tempo (ms)':>12} {'%':>6} "
+               f"{'µs/exec':>9} {'GOSUBs':>8}"]
+        for num in self.hot_lines()[:limit]:
+            count, spent = self.counts[num], self.times[num]
+            out.append(f"{num:>8} {count:>12} {spent * 1000:>12.2f} {spent / total * 100:>6.1f} "
+                       f"{spent / count * 1e6:>9.2f} {self.gosub_calls.get(num, 0):>8}")
+        out.append(f"Tempo total nas linhas: {total * 1000:.2f} ms")
+        return "\n".join(out)
+
+    def to_json(self):
+        return {
+            "total_time": sum(self.times.values()),
+            "lines": [{"line": num,
+                       "count": self.counts[num],
+                       "time": self.times[num],
+                       "gosub_calls": self.gosub_calls.get(num, 0)}
+                      for num in self.hot_lines()],
+        }
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def write_collapsed(self, path):
+        # Formato "pilha;de;frames valor" lido por flamegraph.pl,
+        # speedscope etc. Valores em microssegundos.
+        with open(path, "w", encoding="utf-8") as f:
+            for (frames, line_num), spent in sorted(self.stack_times.items()):
+                stack = ";".join(["main"] + [f"GOSUB {num}" for num in frames] +
+                                 [f"linha {line_num}"])
+                f.write(f"{stack} {max(1, round(spent * 1e6))}\n")
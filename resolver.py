@@ -0,0 +1,76 @@
+# resolver.py
+# -----------------------------
+# Resolução de variáveis do TinyBasic
+# A linguagem só tem as 26 variáveis A-Z. Este passo troca os
+# nomes da AST por índices (slots) de uma lista de 26 posições,
+# para o Interpreter não precisar de dicionário:
+#   ("ID", "B")            -> ("VAR", 1)
+#   ("LET", "A", expr)     -> ("LET", 0, expr)
+#   ("INPUT", "C")         -> ("INPUT", 2)
+# Arrays (DIM, INDEX, LET_INDEX, INPUT_INDEX) também usam o slot
+# da letra, em uma tabela separada (arrays.py).
+# Os demais nós ficam iguais.
+# -----------------------------
+
+# Nomes das variáveis, na ordem dos slots (A=0 ... Z=25)
+VAR_NAMES = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def slot(name):
+    # Índice da variável na lista de slots
+    return ord(name) - ord("A")
+
+
+def assigned_names(ast):
+    # Variáveis que o programa escreve (LET/INPUT), em ordem alfabética
+    return sorted({stmt[1] for _, _, stmts in ast for stmt in stmts
+                   if stmt[0] in ("LET", "INPUT", "INC")})
+
+
+# ============================================================
+# Resolve o programa inteiro ou uma linha (devolvem nós novos)
+# --------------------------------------------------------
+def resolve_program(ast):
+    return [resolve_line(line) for line in ast]
+
+
+def resolve_line(line):
+    _, line_num, stmts = line
+    return ("LINE", line_num, [resolve_stmt(stmt) for stmt in stmts])
+
+
+def resolve_stmt(stmt):
+    t = stmt[0]
+    if t == "LET":
+        _, var, expr = stmt
+        return ("LET", slot(var), resolve_expr(expr))
+    elif t == "INC":
+        _, var, amount = stmt
+        return ("INC", slot(var), amount)
+    elif t == "INPUT":
+        return ("INPUT", slot(stmt[1]))
+    elif t == "LET_INDEX":
+        _, var, index, expr = stmt
+        return ("LET_INDEX", slot(var), resolve_expr(index), resolve_expr(expr))
+    elif t in ("INPUT_INDEX", "DIM"):
+        _, var, expr = stmt
+        return (t, slot(var), resolve_expr(expr))
+    elif t == "PRINT":
+        return ("PRINT", [item if item[0] == "STR" else resolve_expr(item)
+                          for item in stmt[1]])
+    elif t in ("IF", "IFELSE"):
+        (_, left, op, right) = stmt[1]
+        return (t, ("COND", resolve_expr(left), op, resolve_expr(right))) + stmt[2:]
+    return stmt
+
+
+def resolve_expr(expr):
+    if expr[0] == "ID":
+        return ("VAR", slot(expr[1]))
+    elif expr[0] == "BINOP":
+        _, op, left, right = expr
+        return ("BINOP", op, resolve_expr(left), resolve_expr(right))
+    elif expr[0] == "INDEX":
+        _, name, index = expr
+        return ("INDEX", slot(name), resolve_expr(index))
+    return expr
@@ -0,0 +1,234 @@
+# server.py
+# -----------------------------
+# TinyBasic - Servidor de sessões (asyncio)
+# Muitas sessões no mesmo processo e na mesma thread: cada conexão
+# (TCP local ou socket Unix) é uma tarefa asyncio que executa o seu
+# programa em fatias de passos com Interpreter.step() e cede a vez
+# às outras depois de cada fatia. INPUT suspende só a própria
+# sessão, que espera a linha do cliente sem bloquear as demais.
+#
+# Protocolo (texto, uma linha por mensagem):
+#   cliente: linhas do programa, depois RUN (ou QUIT para sair)
+#   servidor: a saída do programa conforme é gerada; em um INPUT,
+#             "Digite X: " e espera um número; no fim, "[ok N passos]"
+#             ou "[erro: mensagem]"
+# Depois de cada execução a sessão aceita um novo programa.
+# -----------------------------
+
+import argparse
+import asyncio
+
+from lexer import lexer
+from parser import Parser
+from interpreter import Interpreter, InputPending, ExecutionStopped, STEP_DONE, STEP_INPUT
+from streams import BufferedOutput, FLUSH_END
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 7777
+BACKLOG = 1024         # conexões aguardando accept (muitos clientes de uma vez)
+
+
+# ============================================================
+# Cotas de cada sessão
+# --------------------------------------------------------
+class Quota:
+    def __init__(self, slice_steps=1000, max_steps=10_000_000, max_lines=10_000,
+                 max_stack=10_000, max_int_bits=4096, max_array_cells=1_000_000):
+        self.slice_steps = slice_steps    # passos por vez antes de ceder a vez
+        self.max_steps = max_steps        # passos por execução
+        self.max_lines = max_lines        # linhas de programa
+        self.max_stack = max_stack        # profundidade de GOSUB
+        self.max_int_bits = max_int_bits  # tamanho máximo de um valor
+        self.max_array_cells = max_array_cells  # valores somando todos os arrays (DIM)
+
+
+# ============================================================
+# Saída e entrada de uma sessão
+# --------------------------------------------------------
+class SessionStream:
+    # Junta o texto descarregado pelo BufferedOutput até o servidor enviá-lo
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, text):
+        self.chunks.append(text)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        text = "".join(self.chunks)
+        self.chunks = []
+        return text
+
+
+class SessionInput:
+    # Sem valor disponível, lança InputPending: step() para antes do
+    # INPUT e a sessão espera a linha do cliente
+    def __init__(self):
+        self.value = None
+
+    def read(self, var, output):
+        if self.value is None:
+            raise InputPending(var)
+        value, self.value = self.value, None
+        return value
+
+
+# ============================================================
+# Interpreter com as cotas de memória da sessão: limita a pilha de
+# GOSUB e o tamanho dos inteiros a cada statement, e o total dos
+# arrays no DIM
+# --------------------------------------------------------
+class SessionInterpreter(Interpreter):
+    def __init__(self, ast, output, input, quota):
+        super().__init__(ast, output, input)
+        self.quota = quota
+        self.arrays.max_cells = quota.max_array_cells
+
+    def execute_stmt(self, stmt, current_index):
+        result = Interpreter.execute_stmt(self, stmt, current_index)
+        t = stmt[0]
+        if t in ("LET", "INC", "INPUT"):
+            if self.slots[stmt[1]].bit_length() > self.quota.max_int_bits:
+                raise Exception(f"Valor maior que {self.quota.max_int_bits} bits")
+        elif t == "GOSUB" and len(self.call_stack) > self.quota.max_stack:
+            raise Exception(f"Mais de {self.quota.max_stack} GOSUBs aninhados")
+        return result
+
+
+# ============================================================
+# Uma conexão
+# --------------------------------------------------------
+class Session:
+    def __init__(self, reader, writer, quota):
+        self.reader = reader
+        self.writer = writer
+        self.quota = quota
+
+    async def send(self, text):
+        if text:
+            self.writer.write(text.encode("utf-8"))
+            await self.writer.drain()
+
+    async def receive(self):
+        line = await self.reader.readline()
+        if not line:
+            return None        # conexão fechada
+        return line.decode("utf-8", errors="replace").rstrip("\r\n")
+
+    async def serve(self):
+        await self.send("TinyBasic pronto. Envie o programa e termine com RUN.\n")
+        lines = []
+        while True:
+            line = await self.receive()
+            if line is None or line.strip().upper() == "QUIT":
+                return
+            if line.strip().upper() != "RUN":
+                if len(lines) >= self.quota.max_lines:
+                    await self.send(f"[erro: programa com mais de {self.quota.max_lines} linhas]\n")
+                    lines = []
+                elif line.strip():
+                    lines.append(line)
+                continue
+            if not await self.execute("\n".join(lines) + "\n"):
+                return
+            lines = []
+
+    async def execute(self, code):
+        # Devolve False se o cliente desconectou no meio da execução
+        stream = SessionStream()
+        values = SessionInput()
+        try:
+            ast = Parser(lexer(code)).parse_program()
+            interpreter = SessionInterpreter(ast, BufferedOutput(stream, flush=FLUSH_END),
+                                             values, self.quota)
+        except Exception as e:
+            await self.send(f"[erro: {e}]\n")
+            return True
+
+        quota = self.quota
+        try:
+            while True:
+                remaining = quota.max_steps - interpreter.steps
+                if remaining <= 0:
+                    raise ExecutionStopped(f"Limite de {quota.max_steps} passos excedido")
+                state = interpreter.step(min(quota.slice_steps, remaining))
+                await self.send(stream.take())
+                if state == STEP_DONE:
+                    break
+                if state == STEP_INPUT:
+                    value = await self.ask(interpreter.waiting_for)
+                    if value is None:
+                        return False
+                    values.value = value
+                else:
+                    await asyncio.sleep(0)     # fim da fatia: vez das outras sessões
+        except Exception as e:
+            await self.send(stream.take())
+            await self.send(f"[erro: {e}]\n")
+            return True
+        await self.send(f"[ok {interpreter.steps} passos]\n")
+        return True
+
+    async def ask(self, var):
+        while True:
+            await self.send(f"Digite {var}: \n")
+            line = await self.receive()
+            if line is None:
+                return None
+            try:
+                return int(line.strip())
+            except ValueError:
+                await self.send("Valor inválido: digite um número inteiro\n")
+
+
+# ============================================================
+# Servidor
+# --------------------------------------------------------
+class SessionServer:
+    def __init__(self, quota=None):
+        self.quota = quota or Quota()
+        self.sessions = set()      # tarefas das conexões abertas
+
+    async def handle(self, reader, writer):
+        task = asyncio.current_task()
+        self.sessions.add(task)
+        try:
+            await Session(reader, writer, self.quota).serve()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.sessions.discard(task)
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle, path=unix_path,
+                                                   backlog=BACKLOG)
+        return await asyncio.start_server(self.handle, host, port, backlog=BACKLOG)
+
+
+async def main(args):
+    quota = Quota(slice_steps=args.slice, max_steps=args.max_steps)
+    server = await SessionServer(quota).start(args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Servidor TinyBasic em {where}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Servidor de sessões TinyBasic")
+    arg_parser.add_argument("--host", default=DEFAULT_HOST)
+    arg_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    arg_parser.add_argument("--unix", metavar="CAMINHO", help="usa um socket Unix em vez de TCP")
+    arg_parser.add_argument("--slice", type=int, default=1000,
+                            help="passos por vez de cada sessão (padrão: 1000)")
+    arg_parser.add_argument("--max-steps", type=int, default=10_000_000,
+                            help="passos por execução (padrão: 10000000)")
+    args = arg_parser.parse_args()
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        pass
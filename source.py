@@ -0,0 +1,37 @@
+# source.py
+# -----------------------------
+# TinyBasic - Leitura do código-fonte
+# Arquivos grandes são mapeados com mmap: o hash do cache e a
+# decodificação leem direto das páginas do arquivo, sem copiar
+# tudo antes para um buffer do Python. Em um acerto do cache o
+# texto nem chega a ser decodificado. Arquivos pequenos usam
+# read(), que custa menos que montar o mapeamento.
+# -----------------------------
+
+import mmap
+import sys
+
+MMAP_MIN_SIZE = 64 * 1024
+
+
+# ============================================================
+# Bytes do programa: mmap, bytes ou a entrada padrão ("-")
+# --------------------------------------------------------
+def open_source(path):
+    if path == "-":
+        return sys.stdin.buffer.read()
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if size < MMAP_MIN_SIZE:
+            f.seek(0)
+            return f.read()
+        # O mapeamento continua válido depois de fechar o arquivo
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def decode_source(data):
+    # Mesmo resultado de open(path, "r").read(): fins de linha viram "\n"
+    text = str(data, "utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
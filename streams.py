@@ -0,0 +1,169 @@
+# streams.py
+# -----------------------------
+# Entrada e saída do Interpreter do TinyBasic
+# Em vez de chamar print()/input() direto, o Interpreter recebe
+# um objeto de saída e um de entrada. Assim a saída pode ser
+# bufferizada e vários interpretadores podem rodar lado a lado
+# no mesmo processo, cada um com seus próprios objetos.
+#
+# Interface de saída:  write_line(texto), flush()
+# Interface de entrada: read(variavel, saida) -> int
+# (ListInput, GeneratorInput e ConsoleInput implementam a entrada)
+# -----------------------------
+
+import sys
+
+# Políticas de descarga do BufferedOutput
+FLUSH_LINE = "line"   # a cada linha (terminal interativo)
+FLUSH_SIZE = "size"   # quando o buffer atinge buffer_size caracteres
+FLUSH_END = "end"     # só no flush() explícito (fim da execução)
+FLUSH_POLICIES = (FLUSH_LINE, FLUSH_SIZE, FLUSH_END)
+
+
+# ============================================================
+# Saída bufferizada
+# Junta as linhas em memória e escreve em blocos no stream.
+# Sem stream, usa o sys.stdout atual no momento da escrita.
+# Política padrão: por linha em terminal, por tamanho no resto.
+# ============================================================
+class BufferedOutput:
+    def __init__(self, stream=None, flush=None, buffer_size=64 * 1024):
+        self.stream = stream
+        if flush is None:
+            target = stream if stream is not None else sys.stdout
+            isatty = getattr(target, "isatty", None)
+            flush = FLUSH_LINE if isatty is not None and isatty() else FLUSH_SIZE
+        if flush not in FLUSH_POLICIES:
+            raise ValueError(f"Política de flush inválida: {flush!r}")
+        self.policy = flush
+        self.buffer_size = buffer_size
+        self.lines = []        # linhas ainda não escritas
+        self.size = 0          # caracteres acumulados em `lines`
+
+    def write_line(self, text):
+        self.lines.append(text)
+        if self.policy == FLUSH_LINE:
+            self.flush()
+        elif self.policy == FLUSH_SIZE:
+            self.size += len(text) + 1
+            if self.size >= self.buffer_size:
+                self.flush()
+
+    def flush(self):
+        if self.lines:
+            stream = self.stream if self.stream is not None else sys.stdout
+            stream.write("\n".join(self.lines) + "\n")
+            self.lines = []
+            self.size = 0
+            stream.flush()
+
+
+# ============================================================
+# Entrada
+# Todos os provedores entregam valores em texto (ou já inteiros)
+# por next_value(); read() converte para int e aplica a política
+# de erro para valor inválido ou entrada esgotada:
+#   INPUT_ERROR: interrompe o programa com erro (padrão)
+#   INPUT_ZERO:  usa 0 no lugar do valor
+#   INPUT_SKIP:  valor inválido é descartado e o próximo é lido
+#                (no terminal, pergunta de novo); entrada esgotada
+#                continua sendo erro
+# ============================================================
+INPUT_ERROR = "error"
+INPUT_ZERO = "zero"
+INPUT_SKIP = "skip"
+INPUT_POLICIES = (INPUT_ERROR, INPUT_ZERO, INPUT_SKIP)
+
+
+class ValueInput:
+    def __init__(self, on_error=INPUT_ERROR):
+        if on_error not in INPUT_POLICIES:
+            raise ValueError(f"Política de entrada inválida: {on_error!r}")
+        self.on_error = on_error
+
+    def next_value(self, var, output):
+        # Próximo valor ou None quando a entrada acabou
+        raise NotImplementedError
+
+    def read(self, var, output):
+        while True:
+            value = self.next_value(var, output)
+            if value is None:
+                if self.on_error == INPUT_ZERO:
+                    return 0
+                raise Exception(f"Entrada esgotada ao ler {var}")
+            try:
+                return int(value)
+            except ValueError:
+                if self.on_error == INPUT_ZERO:
+                    return 0
+                if self.on_error == INPUT_ERROR:
+                    raise Exception(f"Valor inválido para {var}: {value!r}")
+                self.invalid(var, value, output)
+
+    def invalid(self, var, value, output):
+        # Chamado antes de descartar um valor inválido (INPUT_SKIP)
+        pass
+
+
+# ============================================================
+# Entrada interativa pelo terminal (comportamento original)
+# Descarrega a saída antes do prompt para manter a ordem.
+# Fim da entrada (Ctrl+D, pipe vazio) conta como entrada esgotada.
+# ============================================================
+class ConsoleInput(ValueInput):
+    def next_value(self, var, output):
+        output.flush()
+        try:
+            return input(f"Digite {var}: ")
+        except EOFError:
+            return None
+
+    def invalid(self, var, value, output):
+        output.write_line("Valor inválido: digite um número inteiro")
+        output.flush()
+
+
+# ============================================================
+# Entrada a partir de uma lista de valores (arquivos de entrada,
+# execução em lote). Cada INPUT consome o próximo valor, sem
+# prompt nem I/O por leitura.
+# ============================================================
+class ListInput(ValueInput):
+    def __init__(self, values, on_error=INPUT_ERROR):
+        super().__init__(on_error)
+        self.values = list(values)
+        self.position = 0
+
+    @classmethod
+    def from_text(cls, text, on_error=INPUT_ERROR):
+        # Um valor por linha ou separados por espaços
+        return cls(text.split(), on_error)
+
+    @classmethod
+    def from_file(cls, path, on_error=INPUT_ERROR):
+        # Lê o arquivo inteiro de uma vez; "-" lê toda a entrada padrão
+        if path == "-":
+            return cls.from_text(sys.stdin.read(), on_error)
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_text(f.read(), on_error)
+
+    def next_value(self, var, output):
+        if self.position >= len(self.values):
+            return None
+        value = self.values[self.position]
+        self.position += 1
+        return value
+
+
+# ============================================================
+# Entrada a partir de um gerador ou iterável qualquer: os valores
+# são produzidos sob demanda (sequências longas ou infinitas)
+# ============================================================
+class GeneratorInput(ValueInput):
+    def __init__(self, values, on_error=INPUT_ERROR):
+        super().__init__(on_error)
+        self.values = iter(values)
+
+    def next_value(self, var, output):
+        return next(self.values, None)
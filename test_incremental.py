@@ -0,0 +1,59 @@
+# test_incremental.py
+# -----------------------------
+# Testes do front end incremental (incremental.py)
+# Depois de cada edição, o estado incremental tem que ser igual ao
+# de um IncrementalFrontEnd novo analisando o mesmo texto.
+# Uso: python -m unittest test_incremental   (ou pytest)
+# -----------------------------
+
+import random
+import unittest
+
+from incremental import IncrementalFrontEnd
+
+# Linhas válidas, com erro e vazias
+POOL = ["10 PRINT 1", "20 LET = 3", "30 LET A = 2", "", "  ", "40 GOTO 10",
+        "50 PRINT \"x\" A", "60 IF A < 3 THEN 10", "X", "70 LET B = (1 + ",
+        "80 END", "90 REM oi", "100 INPUT A @"]
+
+
+def state(front_end):
+    return (front_end.token_lines(), front_end.ast_lines(), front_end.errors(),
+            [entry.line_num for entry in front_end.entries])
+
+
+class IncrementalTest(unittest.TestCase):
+    def check(self, front_end, source):
+        front_end.update(source)
+        fresh = IncrementalFrontEnd()
+        fresh.update(source)
+        self.assertEqual(state(front_end), state(fresh), source)
+
+    def test_error_line_moves_up(self):
+        # Linha com erro renumerada: o painel de tokens acompanha
+        front_end = IncrementalFrontEnd()
+        self.check(front_end, "10 PRINT 1\n20 LET = 3")
+        self.check(front_end, "20 LET = 3")
+        entry = front_end.entries[0]
+        self.assertEqual(entry.line_num, 1)
+        self.assertIn("linha=1", front_end.token_lines()[0])
+
+    def test_random_edits(self):
+        rng = random.Random(2024)
+        for _ in range(300):
+            lines = [rng.choice(POOL) for _ in range(rng.randint(0, 8))]
+            front_end = IncrementalFrontEnd()
+            self.check(front_end, "\n".join(lines))
+            for _ in range(5):
+                k = rng.random()
+                if k < 0.3 or not lines:
+                    lines.insert(rng.randint(0, len(lines)), rng.choice(POOL))
+                elif k < 0.6:
+                    del lines[rng.randrange(len(lines))]
+                else:
+                    lines[rng.randrange(len(lines))] = rng.choice(POOL)
+                self.check(front_end, "\n".join(lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
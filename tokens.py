@@ -0,0 +1,107 @@
+# tokens.py
+# -----------------------------
+# Definição da classe Token
+# Cada token representa uma unidade lexical do TinyBasic
+# Cada token tem:
+#   - type: tipo do token (ex: NUMBER, LET, PRINT, etc.)
+#   - value: valor associado (ex: 123, "A", "+")
+#   - line: linha no código fonte onde apareceu
+#   - column: coluna no código fonte onde apareceu
+# O arquivo se chama tokens.py (e não token.py) para não esconder
+# o módulo token da biblioteca padrão, usado por inspect, asyncio,
+# concurrent.futures etc.
+# -----------------------------
+
+from array import array
+
+class Token:
+    __slots__ = ("type", "value", "line", "column")  # sem __dict__ por token
+
+    def __init__(self, type_, value, line, column):
+        self.type = type_       # Tipo do token
+        self.value = value      # Valor do token
+        self.line = line        # Linha do token
+        self.column = column    # Coluna do token
+
+    def __repr__(self):
+        # Representação legível para debug
+        return f"Token({self.type}, {self.value}, linha={self.line}, coluna={self.column})"
+
+
+# ============================================================
+# TokenBuffer: armazenamento compacto dos tokens
+# Em vez de um objeto por token, cada campo fica em um array
+# paralelo ("struct of arrays"):
+#   - types: código do tipo (1 byte por token)
+#   - values: valor (referência ao objeto criado pelo lexer)
+#   - lines / columns: inteiros em arrays compactos
+# O Parser lê os campos direto pelos índices, sem criar Tokens.
+# ============================================================
+TOKEN_TYPES = [
+    "NUMBER", "LET", "PRINT", "INPUT", "IF", "THEN", "GOTO", "GOSUB",
+    "RETURN", "END", "DIM", "REM", "ID", "STR",
+    "GE", "LE", "NE", "GT", "LT", "EQ",
+    "PLUS", "MINUS", "MUL", "DIV",
+    "LPAREN", "RPAREN", "COMMA", "COLON",
+    "NEWLINE", "EOF",
+]
+TYPE_CODES = {name: code for code, name in enumerate(TOKEN_TYPES)}
+
+
+class TokenBuffer:
+    def __init__(self):
+        self.types = array("B")     # código do tipo
+        self.values = []            # valor de cada token
+        self.lines = array("i")     # linha de cada token
+        self.columns = array("q")   # coluna (posição no fonte) de cada token
+
+    # Mesma assinatura de Token(...), para ser usado como fábrica no lexer
+    def append(self, type_, value, line, column):
+        self.types.append(TYPE_CODES[type_])
+        self.values.append(value)
+        self.lines.append(line)
+        self.columns.append(column)
+
+    def __len__(self):
+        return len(self.types)
+
+    # Materializa um Token só quando pedido (debug, listagens)
+    def __getitem__(self, index):
+        return Token(TOKEN_TYPES[self.types[index]], self.values[index],
+                     self.lines[index], self.columns[index])
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield self[index]
+
+
+# ============================================================
+# Cursor sobre um TokenBuffer: um único objeto reaproveitado
+# pelo Parser no lugar de current_token. Os campos são lidos
+# dos arrays na posição atual.
+# ============================================================
+class TokenCursor:
+    __slots__ = ("buffer", "index")
+
+    def __init__(self, buffer, index=0):
+        self.buffer = buffer
+        self.index = index
+
+    @property
+    def type(self):
+        return TOKEN_TYPES[self.buffer.types[self.index]]
+
+    @property
+    def value(self):
+        return self.buffer.values[self.index]
+
+    @property
+    def line(self):
+        return self.buffer.lines[self.index]
+
+    @property
+    def column(self):
+        return self.buffer.columns[self.index]
+
+    def __repr__(self):
+        return repr(self.buffer[self.index])
@@ -0,0 +1,322 @@
+# tracing.py
+# -----------------------------
+# Backend com traces compilados do TinyBasic
+# Todo laço TinyBasic é um salto para trás (GOTO ou IF ... THEN).
+# Este backend conta esses saltos por linha de destino; quando uma
+# linha passa do limite, grava o caminho percorrido na próxima volta
+# do laço (o trace) e o compila, com exec, em uma função Python com
+# um `while` e variáveis locais. Cada IF do caminho vira uma guarda:
+# se a condição der diferente do gravado, a função devolve o ponto
+# de saída e a execução segue no interpretador de árvore.
+# Os arrays (DIM) são lidos e escritos pelo ArrayStore, com a mesma
+# verificação de limites do interpretador (aget/aput no trace).
+# -----------------------------
+
+from interpreter import ExecutionStopped, Interpreter
+from resolver import VAR_NAMES
+
+TRACE_THRESHOLD = 50     # saltos para trás até gravar um trace
+MAX_TRACE_LENGTH = 200   # statements; traces maiores são abandonados
+TRACE_CHUNK = 10000      # voltas por entrada (entre as verificações de parada)
+
+# Statements que encerram a gravação (mexem na pilha ou terminam)
+UNTRACEABLE = ("GOSUB", "RETURN", "END")
+
+_OPS = {"PLUS": "+", "MINUS": "-", "MUL": "*"}
+_REL_OPS = {"EQ": "==", "NE": "!=", "LT": "<", "GT": ">", "LE": "<=", "GE": ">="}
+
+
+def _div(left_val, right_val):
+    if right_val == 0:
+        raise Exception("Divisão por zero")
+    return left_val // right_val
+
+
+# ============================================================
+# Trace compilado de um laço
+# --------------------------------------------------------
+class Trace:
+    def __init__(self, header, function, lines, source, line_counts):
+        self.header = header          # índice da linha de início do laço
+        self.function = function      # função gerada
+        self.lines = lines            # linhas executadas por volta
+        self.source = source          # código Python gerado (debug)
+        self.line_counts = line_counts
+        self.entries = 0              # vezes que o trace foi chamado
+        self.iterations = 0           # voltas completas no trace
+        self.guard_exits = 0          # saídas por guarda
+
+
+# ============================================================
+# Geração do código Python a partir do caminho gravado
+# `recorded` é a lista de (índice da linha, posição do statement,
+# statement, resultado) da volta gravada, com variáveis já
+# resolvidas em slots. Cada slot vira uma variável local v_A...v_Z.
+# --------------------------------------------------------
+class TraceCompiler:
+    def __init__(self, header, recorded, line_map):
+        self.header = header
+        self.recorded = recorded
+        self.line_map = line_map
+        self.reads = set()      # variáveis lidas
+        self.writes = set()     # variáveis escritas
+        self.arrays = False     # o trace usa arrays
+
+    def compile(self):
+        body = []
+        body_lines = []         # linhas TinyBasic iniciadas em cada linha de `body`
+        lines = 0               # linhas iniciadas até o statement atual
+        for index, pos, stmt, result in self.recorded:
+            if pos == 0:
+                lines += 1
+            code = self.compile_stmt(index, pos, stmt, result, lines)
+            body.extend(code)
+            body_lines.extend([lines] * len(code))
+
+        out = ["def trace(slots, write_line, read, output, div, arrays, budget):"]
+        for var in sorted(self.reads | self.writes):
+            out.append(f"    v_{VAR_NAMES[var]} = slots[{var}]")
+        if self.arrays:
+            out.append("    aget = arrays.get")
+            out.append("    aput = arrays.put")
+        out.append("    iterations = 0")
+        out.append("    try:")
+        out.append("        while iterations != budget:")
+        # Número da linha do código gerado -> linhas TinyBasic iniciadas
+        # (usado para contar os passos quando um statement gera erro)
+        line_counts = {len(out) + 1 + i: count for i, count in enumerate(body_lines)}
+        out.extend("            " + line for line in body)
+        out.append("            iterations += 1")
+        out.append(f"        return iterations, {self.header}, 0, 0")
+        out.append("    finally:")
+        for var in sorted(self.writes):
+            out.append(f"        slots[{var}] = v_{VAR_NAMES[var]}")
+        if not self.writes:
+            out.append("        pass")
+        source = "\n".join(out) + "\n"
+
+        namespace = {}
+        exec(compile(source, f"<trace linha {self.header}>", "exec"), namespace)
+        return Trace(self.header, namespace["trace"], lines, source, line_counts)
+
+    # Cada saída por guarda devolve (voltas, linha, statement, linhas
+    # iniciadas na volta incompleta); o interpretador refaz o IF
+    def exit(self, index, pos, lines):
+        return f"return iterations, {index}, {pos}, {lines}"
+
+    def compile_stmt(self, index, pos, stmt, result, lines):
+        t = stmt[0]
+        if t == "LET":
+            _, var, expr = stmt
+            self.writes.add(var)
+            return [f"v_{VAR_NAMES[var]} = {self.compile_expr(expr)}"]
+        elif t == "INC":
+            _, var, amount = stmt
+            self.reads.add(var)
+            self.writes.add(var)
+            return [f"v_{VAR_NAMES[var]} += {amount!r}"]
+        elif t == "PRINT":
+            parts = [repr(item[1]) if item[0] == "STR" else f"str({self.compile_expr(item)})"
+                     for item in stmt[1]]
+            return [f"write_line(' '.join([{', '.join(parts)}]))"]
+        elif t == "INPUT":
+            _, var = stmt
+            self.writes.add(var)
+            return [f"v_{VAR_NAMES[var]} = read({VAR_NAMES[var]!r}, output)"]
+        elif t == "DIM":
+            _, var, size = stmt
+            return [f"arrays.dim({var}, {self.compile_expr(size)})"]
+        elif t == "LET_INDEX":
+            _, var, index, expr = stmt
+            self.arrays = True
+            return [f"aput({var}, {self.compile_expr(index)}, {self.compile_expr(expr)})"]
+        elif t == "INPUT_INDEX":
+            _, var, index = stmt
+            self.arrays = True
+            name = VAR_NAMES[var]
+            return [f"index = {self.compile_expr(index)}",
+                    f"arrays.check_index({var}, index)",
+                    f"aput({var}, index, read(f'{name}({{index}})', output))"]
+        elif t == "IF":
+            # Guarda: com resultado diferente do gravado, sai do trace
+            cond = self.compile_cond(stmt[1])
+            if isinstance(result, int):
+                return [f"if not ({cond}):", "    " + self.exit(index, pos, lines)]
+            return [f"if {cond}:", "    " + self.exit(index, pos, lines)]
+        elif t == "IFELSE":
+            # Os dois lados saltam: a guarda confere o lado gravado
+            _, cond, then_line, _ = stmt
+            cond = self.compile_cond(cond)
+            if result == self.line_map.get(then_line):
+                return [f"if not ({cond}):", "    " + self.exit(index, pos, lines)]
+            return [f"if {cond}:", "    " + self.exit(index, pos, lines)]
+        elif t in ("GOTO", "REM"):
+            return []      # o caminho gravado já segue o GOTO
+        raise Exception(f"Statement inesperado no trace: {stmt}")
+
+    def compile_expr(self, expr):
+        kind = expr[0]
+        if kind == "NUMBER":
+            return repr(expr[1])
+        elif kind == "VAR":
+            self.reads.add(expr[1])
+            return f"v_{VAR_NAMES[expr[1]]}"
+        elif kind == "INDEX":
+            self.arrays = True
+            return f"aget({expr[1]}, {self.compile_expr(expr[2])})"
+        elif kind == "BINOP":
+            _, op, left, right = expr
+            l = self.compile_expr(left)
+            r = self.compile_expr(right)
+            if op == "DIV":
+                return f"div({l}, {r})"
+            if op in _OPS:
+                return f"({l} {_OPS[op]} {r})"
+        raise Exception(f"Expr inesperada: {expr}")
+
+    def compile_cond(self, cond):
+        _, left, op, right = cond
+        if op not in _REL_OPS:
+            raise Exception(f"Operador relacional inesperado: {op}")
+        return f"{self.compile_expr(left)} {_REL_OPS[op]} {self.compile_expr(right)}"
+
+
+class TracingInterpreter(Interpreter):
+    def __init__(self, ast, output=None, input=None, threshold=TRACE_THRESHOLD):
+        super().__init__(ast, output, input)
+        self.threshold = threshold
+        self.hits = {}            # linha de destino -> saltos para trás
+        self.traces = {}          # linha de início -> Trace
+        self.rejected = set()     # linhas cujo laço não pode virar trace
+        self.recording = None     # statements gravados da volta atual
+        self.recording_header = None
+
+    # ========================================================
+    # Laço principal: igual ao Interpreter.run, mas entra nos
+    # traces compilados e grava os laços quentes
+    # --------------------------------------------------------
+    def run(self, max_steps=None):
+        try:
+            i = 0
+            n = len(self.ast)
+            while 0 <= i < n:
+                if self.recording is None:
+                    trace = self.traces.get(i)
+                    if trace is not None:
+                        # Sem limite de passos o trace também roda em
+                        # fatias, para que cancel() seja atendido
+                        budget = TRACE_CHUNK
+                        if max_steps is not None:
+                            self.check_stop(max_steps)
+                            budget = min((max_steps - self.steps) // trace.lines, TRACE_CHUNK)
+                        elif self.stop_requested:
+                            raise ExecutionStopped("Execução interrompida")
+                        if budget != 0:
+                            i = self.run_trace(trace, budget, max_steps is not None)
+                            continue
+                if max_steps is not None:
+                    self.check_stop(max_steps)
+                    self.steps += 1
+                if self.recording is None:
+                    next_i = self.execute_line(i)
+                else:
+                    next_i = self.record_line(i)
+                if next_i == -1:
+                    break
+                if next_i <= i and self.recording is None:
+                    self.backward_jump(next_i)
+                i = next_i
+        finally:
+            self.output.flush()
+
+    def run_trace(self, trace, budget, count_steps):
+        trace.entries += 1
+        try:
+            iterations, index, pos, lines = trace.function(
+                self.slots, self.output.write_line, self.input.read, self.output,
+                _div, self.arrays, budget)
+        except Exception as e:
+            if count_steps:
+                self.steps += self.steps_at_error(trace, e.__traceback__)
+            raise
+        trace.iterations += iterations
+        if count_steps:
+            self.steps += iterations * trace.lines + lines
+        if lines == 0:
+            return index        # voltas esgotadas: volta ao início do laço
+        trace.guard_exits += 1
+        return self.finish_line(index, pos)
+
+    def steps_at_error(self, trace, tb):
+        # Passos até o erro: acha o frame da função gerada no traceback
+        while tb is not None and tb.tb_frame.f_code is not trace.function.__code__:
+            tb = tb.tb_next
+        if tb is None:
+            return 0
+        iterations = tb.tb_frame.f_locals["iterations"]
+        trace.iterations += iterations
+        return iterations * trace.lines + trace.line_counts.get(tb.tb_lineno, 0)
+
+    def finish_line(self, index, pos):
+        # Continua uma linha a partir do statement `pos` (saída de guarda)
+        for stmt in self.resolved_line(index)[2][pos:]:
+            result = self.execute_stmt(stmt, index)
+            if isinstance(result, int):
+                return result
+        return index + 1
+
+    # ========================================================
+    # Detecção de laços quentes e gravação do trace
+    # --------------------------------------------------------
+    def backward_jump(self, target):
+        if target in self.traces or target in self.rejected:
+            return
+        count = self.hits.get(target, 0) + 1
+        self.hits[target] = count
+        if count >= self.threshold:
+            self.recording = []
+            self.recording_header = target
+
+    def record_line(self, index):
+        recorded = self.recording
+        for pos, stmt in enumerate(self.resolved_line(index)[2]):
+            if stmt[0] in UNTRACEABLE or len(recorded) >= MAX_TRACE_LENGTH:
+                self.stop_recording(None)
+                return self.finish_line(index, pos)
+            result = self.execute_stmt(stmt, index)
+            recorded.append((index, pos, stmt, result))
+            if isinstance(result, int):
+                next_i = result
+                break
+        else:
+            next_i = index + 1
+        if next_i == self.recording_header:
+            self.stop_recording(recorded)
+        return next_i
+
+    def stop_recording(self, recorded):
+        header = self.recording_header
+        self.recording = self.recording_header = None
+        if recorded:
+            self.traces[header] = TraceCompiler(header, recorded, self.line_map).compile()
+        else:
+            self.rejected.add(header)
+
+    # ========================================================
+    # Contadores
+    # --------------------------------------------------------
+    def trace_iterations(self):
+        return sum(trace.iterations for trace in self.traces.values())
+
+    def report(self):
+        out = ["Traces compilados:",
+               f"{'linha':>8} {'linhas/volta':>13} {'entradas':>9} {'voltas':>12} {'saídas':>8}"]
+        for header in sorted(self.traces):
+            trace = self.traces[header]
+            out.append(f"{self.ast[header][1]:>8} {trace.lines:>13} {trace.entries:>9} "
+                       f"{trace.iterations:>12} {trace.guard_exits:>8}")
+        rejected = ", ".join(str(self.ast[i][1]) for i in sorted(self.rejected))
+        out.append(f"Voltas em traces: {self.trace_iterations()}")
+        if rejected:
+            out.append(f"Laços não compilados (GOSUB/RETURN/END ou longos demais): {rejected}")
+        return "\n".join(out)
@@ -0,0 +1,75 @@
+# workloads.py
+# -----------------------------
+# Gerador de programas TinyBasic sintéticos para benchmarks
+# Cada função recebe o tamanho da carga e devolve o código-fonte.
+# -----------------------------
+
+
+# ============================================================
+# Programa longo sem laços: só LETs com aritmética
+# --------------------------------------------------------
+def straight_line(lines):
+    out = ["10 LET A = 1", "20 LET B = 7"]
+    for i in range(lines):
+        out.append(f"{30 + 10 * i} LET A = A + {i} * (B - 3) / 2")
+    out.append(f"{30 + 10 * lines} PRINT A")
+    return "\n".join(out) + "\n"
+
+
+# ============================================================
+# Laço contado feito com IF/GOTO
+# --------------------------------------------------------
+def counted_loop(iterations):
+    return "\n".join([
+        "10 LET I = 0",
+        "20 LET S = 0",
+        f"30 LET N = {iterations}",
+        "40 LET S = S + I * 2",
+        "50 LET T = S / 3 : LET I = I + 1",
+        "60 IF I < N THEN 40",
+        "70 PRINT S, T",
+        "80 END",
+    ]) + "\n"
+
+
+# ============================================================
+# Recursão profunda com GOSUB: a sub-rotina 100 chama a si mesma
+# até N chegar a 0, e o programa repete isso R vezes
+# --------------------------------------------------------
+def gosub_recursion(depth, repeat=1):
+    return "\n".join([
+        "10 LET R = 0",
+        f"20 LET N = {depth}",
+        "30 GOSUB 100",
+        "40 LET R = R + 1",
+        f"50 IF R < {repeat} THEN 20",
+        "60 PRINT R, N",
+        "70 END",
+        "100 IF N = 0 THEN 140",
+        "110 LET N = N - 1",
+        "120 GOSUB 100",
+        "130 LET N = N + 0",
+        "140 RETURN",
+    ]) + "\n"
+
+
+# ============================================================
+# Muita saída: um laço que imprime uma linha por iteração
+# --------------------------------------------------------
+def print_heavy(lines):
+    return "\n".join([
+        "10 LET I = 0",
+        "20 PRINT \"linha\", I, I * 2",
+        "30 LET I = I + 1",
+        f"40 IF I < {lines} THEN 20",
+        "50 END",
+    ]) + "\n"
+
+
+# Cargas padrão do benchmark: nome -> (gerador, tamanho)
+WORKLOADS = {
+    "straight_line": (straight_line, 20000),
+    "counted_loop": (counted_loop, 200000),
+    "gosub_recursion": (lambda depth: gosub_recursion(depth, 200), 500),
+    "print_heavy": (print_heavy, 100000),
+}